@@ -4,25 +4,31 @@ Enhanced with database, duplicate detection, and better viewing
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import os
+import re
 import time
+import hashlib
+import threading
 from datetime import datetime, timezone
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 
 # Import our existing modules
 from google_search import (
     GoogleSearchClient,
-    create_search_from_template,
+    PartialSearchError,
+    build_template_query,
+    location_patterns,
     rank_results_by_locations,
-    result_matches_locations,
-    build_reddit_subreddits,
-    reddit_exclude_terms
+    result_matches_locations
 )
 from google_places import GooglePlacesClient, normalize_places_result, places_query_for_template
 from contact_extractor import ContactExtractor
 from search_templates import SearchTemplates
 from database import get_database as get_db_instance
+from dedup import NearDupIndex
 
 # Page configuration
 st.set_page_config(
@@ -33,7 +39,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+_CSS_BLOCK = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -62,7 +68,50 @@ st.markdown("""
         font-size: 2rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_CSS_BLOCK, unsafe_allow_html=True)
+
+_FOOTER_BLOCK = """
+<div style="text-align: center; color: #666;">
+    <p>Real Estate Lead Finder Pro | Built with Streamlit | Powered by Google Custom Search API</p>
+</div>
+"""
+
+# Columns shown/exported for search results
+NEW_LEAD_COLUMNS = ('first_name', 'last_name', 'company_name', 'website_url', 'email', 'phone')
+ALL_RESULT_COLUMNS = ('status', *NEW_LEAD_COLUMNS)
+# Result columns plus the flag location_badge_columns reads
+_RESULT_FRAME_COLUMNS = (*NEW_LEAD_COLUMNS, 'location_match')
+
+# Leads shown per page on the database view
+LEADS_PAGE_SIZE = 500
+# Lead fields the database view reads for display, matching and scoring
+DB_PAGE_COLUMNS = (
+    'id', 'first_name', 'last_name', 'company_name', 'email', 'phone',
+    'website_url', 'template', 'locations', 'times_seen', 'created_at',
+    'post_created_at', 'lead_source', 'location_match', 'keyword_match',
+    'intent_match', 'created_ts', 'post_ts'
+)
+
+# Database view sort labels -> db.query_leads sort keys. Lead Score has no
+# SQL equivalent: it loads every matching lead, scores and sorts them, then pages.
+DB_SORT_KEYS = {
+    "Newest First": "newest",
+    "Oldest First": "oldest",
+    "Most Seen": "most_seen",
+    "Has Email": "has_email",
+    "Has Phone": "has_phone",
+    "Location Match": "location_match",
+    "Lead Score": "newest",
+}
+
+# Database view sort labels -> (columns, ascending) used to re-sort the loaded leads
+PAGE_SORT_KEYS = {
+    "Has Email": (['_has_email', 'created_at'], [False, False]),
+    "Has Phone": (['_has_phone', 'created_at'], [False, False]),
+    "Location Match": (['location_match', 'created_at'], [False, False]),
+    "Lead Score": (['lead_score', 'created_at'], [False, False]),
+}
 
 # Initialize database
 @st.cache_resource
@@ -74,6 +123,79 @@ def get_database():
 
 db, db_type = get_database()
 
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_stats() -> dict:
+    """Database stats, cached briefly so widget reruns skip the DB round-trip."""
+    return db.get_stats()
+
+
+def _data_version() -> tuple:
+    """
+    Cheap token that changes when leads are added or searches are logged,
+    including writes from other processes (backfill scripts, other sessions).
+    """
+    stats = _cached_stats()
+    return stats.get('total_leads', 0), stats.get('total_searches', 0)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _cached_templates(version: tuple = None) -> list:
+    """Distinct lead templates, cached per _data_version()."""
+    return db.get_distinct_templates()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_query_leads(template: str, search: str, sort_by: str, page: int, version: tuple = None) -> tuple:
+    """One page of leads from db.query_leads, cached per _data_version()."""
+    return db.query_leads(
+        template=template,
+        search=search or None,
+        sort_by=sort_by,
+        limit=LEADS_PAGE_SIZE,
+        offset=(page - 1) * LEADS_PAGE_SIZE,
+        columns=DB_PAGE_COLUMNS
+    )
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_matching_leads(template: str, search: str, sort_by: str, version: tuple = None) -> list:
+    """Every lead matching the template/search filters, read a page at a time via db.query_leads."""
+    leads = []
+    while True:
+        page, total = db.query_leads(
+            template=template,
+            search=search or None,
+            sort_by=sort_by,
+            limit=LEADS_PAGE_SIZE,
+            offset=len(leads),
+            columns=DB_PAGE_COLUMNS
+        )
+        leads.extend(page)
+        if not page or len(leads) >= total:
+            return leads
+
+
+@st.cache_resource
+def _search_lock() -> threading.Lock:
+    """Process-wide lock shared by all sessions (app.py re-runs per rerun)."""
+    return threading.Lock()
+
+
+@st.cache_resource(show_spinner=False)
+def _near_dup_index() -> NearDupIndex:
+    """Near-duplicate index seeded with the leads already in the DB."""
+    return NearDupIndex.from_leads(
+        db.get_all_leads(columns=('company_name', 'website_url', 'lead_source'))
+    )
+
+
+def _invalidate_db_cache():
+    """Drop cached DB reads after writes so the next render sees fresh data."""
+    _cached_stats.clear()
+    _cached_query_leads.clear()
+    _cached_matching_leads.clear()
+
 # Show database status at the top
 st.sidebar.markdown(f"**Database:** {db_type}")
 
@@ -89,196 +211,312 @@ def check_api_credentials():
     return api_key and cse_id
 
 
+# Exports above this many rows are streamed row-by-row with xlsxwriter
+EXCEL_STREAMING_THRESHOLD = 5000
+
+
+def _write_excel_streaming(df: pd.DataFrame, output: BytesIO) -> None:
+    """Write df to output with xlsxwriter constant_memory (rows flushed as written)."""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('Leads')
+    worksheet.write_row(0, 0, [str(col) for col in df.columns])
+    # constant_memory only keeps the current row, so cells must be written
+    # row-major (pandas' to_excel writes column by column).
+    values = df.astype(object).where(df.notna(), None)
+    for row_idx, row in enumerate(values.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_idx, 0, row)
+    workbook.close()
+
+
 def get_download_data(df, file_format="excel"):
     """Generate download data for dataframe."""
     if file_format == "excel":
         output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Leads')
+        if len(df) > EXCEL_STREAMING_THRESHOLD:
+            _write_excel_streaming(df, output)
+        else:
+            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+                df.to_excel(writer, index=False, sheet_name='Leads')
         output.seek(0)
         return output.getvalue()
+    elif file_format == "parquet":
+        output = BytesIO()
+        df.to_parquet(output, engine='pyarrow', compression='snappy', index=False)
+        return output.getvalue()
     else:  # CSV
-        return df.to_csv(index=False).encode('utf-8')
-
-
-def apply_location_badge(df: pd.DataFrame) -> pd.DataFrame:
-    """Add a small badge to the name/company fields when location matches."""
-    if "location_match" not in df.columns:
-        df["location_match"] = False
-
-    def add_badge(row: pd.Series) -> pd.Series:
-        if not row.get("location_match"):
-            return row
-        if row.get("company_name"):
-            row["company_name"] = f"📍 {row['company_name']}"
-        elif row.get("first_name"):
-            row["first_name"] = f"📍 {row['first_name']}"
-        elif row.get("last_name"):
-            row["last_name"] = f"📍 {row['last_name']}"
-        return row
-
-    return df.apply(add_badge, axis=1)
-
-
-def apply_quality_badges(df: pd.DataFrame) -> pd.DataFrame:
-    """Add compact badges to highlight lead quality signals."""
-    def add_badges(row: pd.Series) -> pd.Series:
-        badges = []
-        if row.get("good_lead"):
-            badges.append("✅")
-        if row.get("keyword_match") is False:
-            badges.append("⚠️")
-        if row.get("intent_match"):
-            badges.append("🎯")
-        if row.get("location_match"):
-            badges.append("📍")
-        if row.get("lead_recency_days", 9999) <= 7:
-            badges.append("🕒")
-        if row.get("contact_score", 0) >= 10:
-            badges.append("☎")
-        if row.get("lead_source") == "places":
-            badges.append("🏢")
-
-        if not badges:
-            return row
-
-        badge_str = " ".join(badges)
-        if row.get("company_name"):
-            row["company_name"] = f"{badge_str} {row['company_name']}"
-        elif row.get("first_name"):
-            row["first_name"] = f"{badge_str} {row['first_name']}"
-        elif row.get("last_name"):
-            row["last_name"] = f"{badge_str} {row['last_name']}"
-        return row
-
-    return df.apply(add_badges, axis=1)
-
-
-def lead_location_match(lead: pd.Series) -> bool:
-    """Best-effort location match using stored locations and lead fields."""
-    existing = lead.get("location_match")
-    if isinstance(existing, bool):
-        return existing
-    locations_str = lead.get("locations", "") or ""
-    locations = [loc.strip() for loc in locations_str.split(",") if loc.strip()]
-    result_stub = {
-        "title": lead.get("company_name", "") or "",
-        "snippet": "",
-        "link": lead.get("website_url", "") or ""
-    }
-    return result_matches_locations(result_stub, locations)
+        output = BytesIO()
+        df.to_csv(output, index=False, encoding='utf-8', chunksize=10_000, lineterminator='\n')
+        return output.getvalue()
 
 
-def lead_keyword_match(lead: pd.Series) -> bool:
-    """Best-effort keyword match using template keywords and stored fields."""
-    template_name = lead.get("template") or ""
+@st.cache_data(show_spinner=False, max_entries=8)
+def _export_bytes(df: pd.DataFrame, file_format: str = "excel") -> bytes:
+    """Export of df, cached on the frame's contents across reruns."""
+    return get_download_data(df, file_format)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _arrow_table(df: pd.DataFrame):
+    """Arrow table for st.dataframe, reused while the frame's contents are unchanged."""
+    import pyarrow as pa
+
     try:
-        tmpl = SearchTemplates.get_template(template_name)
-    except Exception:
-        return False
-    combined = f"{lead.get('company_name') or ''} {lead.get('website_url') or ''}"
-    return any(kw.lower() in combined.lower() for kw in tmpl.get("keywords", []))
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns: let Streamlit apply its own fallbacks
+        return df
+
 
+def _has_value(value) -> bool:
+    """Truthiness that treats missing values (None/NaN/pd.NA) as empty."""
+    return not pd.isna(value) and bool(value)
 
-def detect_intent_match(text: str, phrases: list) -> bool:
-    text_lower = (text or "").lower()
-    return any(phrase in text_lower for phrase in (phrases or []))
+
+# Badges go on the first non-empty of these columns
+_BADGE_COLUMNS = ("company_name", "first_name", "last_name")
+
+
+def _flag(series: pd.Series) -> pd.Series:
+    """Vectorized truthiness of a column, treating missing values as False."""
+    return series.astype(object).where(series.notna(), False).astype(bool)
+
+
+def _non_empty(series: pd.Series) -> pd.Series:
+    """Mask of cells that hold a non-empty value."""
+    return series.notna() & series.astype(str).ne("")
+
+
+def _prefix_first_filled(df: pd.DataFrame, mask: pd.Series, badge) -> dict:
+    """
+    Badged copies of the name columns for masked rows.
+
+    badge (str or per-row Series) goes on the first filled name column of each
+    masked row. Only columns that change are returned, as {column: Series},
+    so callers can assign them onto a narrow display frame without copying df.
+    """
+    badged = {}
+    remaining = mask
+    for col in _BADGE_COLUMNS:
+        if not remaining.any():
+            break
+        if col not in df.columns:
+            continue
+        target = remaining & _non_empty(df[col])
+        if target.any():
+            prefix = badge[target] if isinstance(badge, pd.Series) else badge
+            updated = df[col].copy()
+            updated[target] = prefix + " " + updated[target].astype(str)
+            badged[col] = updated
+        remaining = remaining & ~target
+    return badged
+
+
+def location_badge_columns(df: pd.DataFrame) -> dict:
+    """Name/company columns with a small badge where the location matches."""
+    return _prefix_first_filled(df, _flag(_column(df, "location_match", False)), "📍")
+
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    """df[name], or a constant Series when the column is missing."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index)
+
+
+def quality_badge_columns(df: pd.DataFrame) -> dict:
+    """Name/company columns with compact badges highlighting lead quality signals."""
+    keyword_match = _column(df, "keyword_match", None)
+    badge_masks = [
+        (_flag(_column(df, "good_lead", False)), "✅"),
+        (keyword_match.notna() & ~_flag(keyword_match), "⚠️"),
+        (_flag(_column(df, "intent_match", False)), "🎯"),
+        (_flag(_column(df, "location_match", False)), "📍"),
+        (pd.to_numeric(_column(df, "lead_recency_days", 9999), errors="coerce").fillna(9999) <= 7, "🕒"),
+        (pd.to_numeric(_column(df, "contact_score", 0), errors="coerce").fillna(0) >= 10, "☎"),
+        (_column(df, "lead_source", "").eq("places"), "🏢"),
+    ]
+
+    badges = pd.Series("", index=df.index)
+    for mask, badge in badge_masks:
+        badges = badges + np.where(mask.to_numpy(dtype=bool), f"{badge} ", "")
+    badges = badges.str.rstrip()
+
+    return _prefix_first_filled(df, badges.ne(""), badges)
+
+
+def _location_mask(text: pd.Series, name_re, abbrev_re) -> np.ndarray:
+    """Column form of result_matches_locations for patterns from location_patterns."""
+    mask = np.zeros(len(text), dtype=bool)
+    if name_re is not None:
+        mask |= text.str.lower().str.strip().str.contains(name_re, regex=True).to_numpy(dtype=bool)
+    if abbrev_re is not None:
+        mask |= text.str.contains(abbrev_re, regex=True).to_numpy(dtype=bool)
+    return mask
+
+
+def df_location_match(df: pd.DataFrame) -> pd.Series:
+    """
+    Best-effort location match using stored locations and lead fields.
+
+    Leads are grouped by their stored locations string so each distinct set
+    of locations is compiled once and matched over the group in one pass.
+    """
+    company = _column(df, "company_name", None).fillna("").astype(str)
+    website = _column(df, "website_url", None).fillna("").astype(str)
+    # Same "title snippet link" text result_matches_locations builds (no snippet)
+    combined = company + "  " + website
+    locations = _column(df, "locations", None).fillna("").astype(str)
+
+    matches = pd.Series(False, index=df.index)
+    for locations_str, text in combined.groupby(locations, sort=False):
+        name_re, abbrev_re = location_patterns(
+            tuple(loc.strip() for loc in locations_str.split(",") if loc.strip())
+        )
+        matches[text.index] = _location_mask(text, name_re, abbrev_re)
+    return matches
+
+
+@st.cache_resource(show_spinner=False)
+def _get_template_cached(template_name: str) -> dict:
+    """Shared, read-only copy of a search template (templates are static)."""
+    return SearchTemplates.get_template(template_name)
+
+
+@st.cache_data(show_spinner=False)
+def _template_labels() -> dict:
+    """Template name -> "name - description" label, in sidebar category order."""
+    return {
+        template_name: f"{template_name} - {_get_template_cached(template_name)['description']}"
+        for templates in SearchTemplates.list_by_category().values()
+        for template_name in templates
+    }
+
+
+def df_keyword_match(df: pd.DataFrame) -> pd.Series:
+    """
+    Best-effort keyword match using template keywords and stored fields.
+
+    One compiled keyword pattern per template, applied to that template's
+    leads as a column.
+    """
+    company = _column(df, "company_name", None).fillna("").astype(str)
+    website = _column(df, "website_url", None).fillna("").astype(str)
+    combined = (company + " " + website).str.lower()
+    templates = _column(df, "template", None).fillna("").astype(str)
+
+    matches = pd.Series(False, index=df.index)
+    for template_name, text in combined.groupby(templates, sort=False):
+        try:
+            tmpl = _get_template_cached(template_name)
+        except Exception:
+            continue
+        pattern = _phrase_pattern(tmpl.get("keywords", []), lowercase=True)
+        matches[text.index] = _phrase_mask(text, pattern)
+    return matches
+
+
+# Link domain -> lead_source, checked in this order (a redirect link can
+# name several domains); links on any other domain are "cse"
+LEAD_SOURCE_DOMAINS = {
+    "reddit.com": "reddit",
+    "facebook.com": "facebook",
+    "instagram.com": "instagram",
+    "linkedin.com": "linkedin",
+    "nextdoor.com": "nextdoor",
+    "tiktok.com": "tiktok",
+    "youtube.com": "youtube",
+    "pinterest.com": "pinterest",
+    "craigslist.org": "craigslist",
+}
+
+
+def lead_sources_from_links(links: pd.Series) -> pd.Series:
+    """Classify a whole column of result links into lead sources at once."""
+    lowered = links.fillna("").astype(str).str.lower()
+    # np.select takes the first true condition, keeping the domain priority order
+    sources = np.select(
+        [lowered.str.contains(domain, regex=False).to_numpy(dtype=bool) for domain in LEAD_SOURCE_DOMAINS],
+        list(LEAD_SOURCE_DOMAINS.values()),
+        default="cse"
+    )
+    return pd.Series(sources, index=links.index, dtype=object)
 
 
 def lead_source_from_link(link: str) -> str:
-    if not link:
-        return "cse"
-    link_lower = link.lower()
-    if "reddit.com" in link_lower:
-        return "reddit"
-    if "facebook.com" in link_lower:
-        return "facebook"
-    if "instagram.com" in link_lower:
-        return "instagram"
-    if "linkedin.com" in link_lower:
-        return "linkedin"
-    if "nextdoor.com" in link_lower:
-        return "nextdoor"
-    if "tiktok.com" in link_lower:
-        return "tiktok"
-    if "youtube.com" in link_lower:
-        return "youtube"
-    if "pinterest.com" in link_lower:
-        return "pinterest"
-    if "craigslist.org" in link_lower:
-        return "craigslist"
+    link_lower = (link or "").lower()
+    for domain, source in LEAD_SOURCE_DOMAINS.items():
+        if domain in link_lower:
+            return source
     return "cse"
 
 
-def compute_lead_score(row: pd.Series) -> pd.Series:
-    """Compute a 0-100 lead score and helper fields for display."""
-    score = 0
-    intent_match = bool(row.get("intent_match"))
-    location_match = bool(row.get("location_match"))
-    if location_match:
-        score += 35
-    if intent_match:
-        score += 30
-
-    recency_days = row.get("lead_recency_days", 9999)
-    if recency_days <= 7:
-        score += 20
-    elif recency_days <= 30:
-        score += 15
-    elif recency_days <= 60:
-        score += 10
-    elif recency_days <= 90:
-        score += 5
-
-    contact_score = 0
-    if row.get("email"):
-        contact_score += 7
-    if row.get("phone"):
-        contact_score += 7
-    if row.get("website_url"):
-        contact_score += 6
-    score += contact_score
-
-    keyword_match = row.get("keyword_match")
-    intent_match = bool(row.get("intent_match"))
-    if keyword_match is True:
-        score += 8
-    elif keyword_match is False:
-        score -= 5
+# Every lead_source value the app writes
+LEAD_SOURCES = ("cse", "places", *LEAD_SOURCE_DOMAINS.values())
+LEAD_SOURCE_DTYPE = pd.CategoricalDtype(LEAD_SOURCES)
+
+# Lead score bonus per lead_source; anything else gets DEFAULT_SOURCE_BONUS
+SOURCE_BONUS = {
+    "places": 8,
+    "linkedin": 5,
+    "facebook": 4,
+    "instagram": 3,
+    "reddit": 2,
+}
+DEFAULT_SOURCE_BONUS = 3
+# Bonus by LEAD_SOURCE_DTYPE code; the trailing entry is for code -1 (unknown)
+_SOURCE_BONUS_BY_CODE = np.array(
+    [SOURCE_BONUS.get(source, DEFAULT_SOURCE_BONUS) for source in LEAD_SOURCES]
+    + [DEFAULT_SOURCE_BONUS]
+)
+
+
+def compute_lead_scores(df: pd.DataFrame) -> pd.DataFrame:
+    """Compute 0-100 lead scores and helper fields for display, column-wise."""
+    location_match = _flag(_column(df, "location_match", False)).to_numpy()
+    intent_match = _flag(_column(df, "intent_match", False)).to_numpy()
+    recency_days = pd.to_numeric(
+        _column(df, "lead_recency_days", 9999), errors="coerce"
+    ).fillna(9999).to_numpy()
+
+    score = location_match * 35 + intent_match * 30
+    score = score + np.select(
+        [recency_days <= 7, recency_days <= 30, recency_days <= 60, recency_days <= 90],
+        [20, 15, 10, 5],
+        default=0
+    )
+
+    contact_score = (
+        _flag(_column(df, "email", None)).to_numpy() * 7
+        + _flag(_column(df, "phone", None)).to_numpy() * 7
+        + _flag(_column(df, "website_url", None)).to_numpy() * 6
+    )
+    score = score + contact_score
+
+    keyword_col = _column(df, "keyword_match", None)
+    keyword_match = _flag(keyword_col).to_numpy()
+    keyword_known = keyword_col.notna().to_numpy()
+    score = score + np.where(keyword_known & keyword_match, 8, 0)
+    score = score - np.where(keyword_known & ~keyword_match, 5, 0)
 
     # Penalize non-Reddit leads that lack intent/keyword match instead of deleting.
-    if row.get("lead_source") not in {"reddit", "places"}:
-        if not intent_match and not keyword_match:
-            score -= 12
-
-    source = row.get("lead_source")
-    if source == "places":
-        score += 8
-    elif source == "linkedin":
-        score += 5
-    elif source == "facebook":
-        score += 4
-    elif source == "instagram":
-        score += 3
-    elif source == "reddit":
-        score += 2
-    else:
-        score += 3
+    source_codes = LEAD_SOURCE_DTYPE.categories.get_indexer(_column(df, "lead_source", None))
+    other_source = ~np.isin(source_codes, LEAD_SOURCE_DTYPE.categories.get_indexer(["reddit", "places"]))
+    score = score - np.where(other_source & ~intent_match & ~keyword_match, 12, 0)
 
-    good_lead = intent_match and location_match and recency_days <= 60
-    if good_lead:
-        score += 10
+    score = score + _SOURCE_BONUS_BY_CODE[source_codes]
 
-    # Enforce stricter scoring: no "good" score without intent match.
-    if not intent_match:
-        score = min(score, 60)
+    good_lead = intent_match & location_match & (recency_days <= 60)
+    score = score + np.where(good_lead, 10, 0)
 
-    score = max(0, min(100, score))
+    # Enforce stricter scoring: no "good" score without intent match.
+    score = np.where(intent_match, score, np.minimum(score, 60))
 
-    row["lead_score"] = int(score)
-    row["contact_score"] = contact_score
-    row["good_lead"] = good_lead
-    return row
+    df["lead_score"] = np.clip(score, 0, 100).astype(int)
+    df["contact_score"] = contact_score
+    df["good_lead"] = good_lead
+    return df
 
 
 def run_cse_search(
@@ -286,89 +524,294 @@ def run_cse_search(
     query: str,
     total_results: int,
     delay: float,
-    date_restrict: str = None
+    date_restrict: str = None,
+    raise_errors: bool = False
 ) -> list:
     """Compat wrapper for older GoogleSearchClient versions without pagination."""
     if hasattr(client, "search_multiple_pages"):
-        return client.search_multiple_pages(query, total_results=total_results, delay=delay, date_restrict=date_restrict)
+        return client.search_multiple_pages(
+            query,
+            total_results=total_results,
+            delay=delay,
+            date_restrict=date_restrict,
+            raise_errors=raise_errors
+        )
+
+    import requests
 
     results = []
     results_per_page = 10
     pages_needed = (total_results + results_per_page - 1) // results_per_page
     for page in range(pages_needed):
         start_index = page * results_per_page + 1
-        results.extend(
-            client.search(
+        try:
+            page_results = client.search(
                 query,
                 num_results=results_per_page,
                 start_index=start_index,
-                date_restrict=date_restrict
+                date_restrict=date_restrict,
+                raise_errors=raise_errors
             )
-        )
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise PartialSearchError(results, e) from e
+        results.extend(page_results)
         if page < pages_needed - 1:
             time.sleep(delay)
     return results
 
 
+@st.cache_resource(show_spinner=False)
+def _search_client() -> GoogleSearchClient:
+    """Shared Google CSE client (credentials come from the environment)."""
+    return GoogleSearchClient()
+
+
+@st.cache_resource(show_spinner=False)
+def _places_client() -> GooglePlacesClient:
+    """Shared Places client, so its session and geocode cache survive reruns."""
+    return GooglePlacesClient()
+
+
+@st.cache_data(ttl=900, show_spinner=False)
+def _cached_cse_search(query: str, total_results: int, delay: float, date_restrict: str = None) -> list:
+    """
+    run_cse_search, memoized so identical searches don't spend API quota again.
+    A failed page raises PartialSearchError instead of returning fewer
+    results, so incomplete searches aren't cached.
+    """
+    return run_cse_search(
+        _search_client(),
+        query,
+        total_results=total_results,
+        delay=delay,
+        date_restrict=date_restrict,
+        raise_errors=True
+    )
+
+
+def _cse_search(query: str, total_results: int, delay: float, date_restrict: str = None) -> list:
+    """
+    _cached_cse_search, falling back to the results fetched before a failed
+    page (with a warning) so a late error doesn't discard them.
+    """
+    try:
+        return _cached_cse_search(query, total_results, delay, date_restrict)
+    except PartialSearchError as e:
+        st.warning(
+            f"⚠️ Google search stopped early ({e}). "
+            f"Showing the {len(e.results)} results fetched before the error."
+        )
+        return e.results
+
+
+@st.cache_data(ttl=900, show_spinner=False)
+def _cached_places_search(query: str, locations: tuple, max_results: int) -> tuple:
+    """Places search_locations, memoized like _cached_cse_search."""
+    return _places_client().search_locations(
+        base_query=query,
+        locations=list(locations),
+        max_results=max_results
+    )
+
+
+# Reddit's unauthenticated JSON endpoints are rate limited per IP, so keep
+# the fan-out modest and let the adapter back off on 429/5xx
+REDDIT_FETCH_WORKERS = 8
+
+
+@st.cache_resource(show_spinner=False)
+def _reddit_session():
+    """Connection-pooled session for Reddit JSON lookups."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers["User-Agent"] = "LeadFinderBot/1.0"
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _reddit_post_created(link: str) -> tuple:
+    """
+    Look up a Reddit post's created_utc.
+
+    Returns (reachable, created_utc). reachable is False when Reddit answered
+    with an error status. Network/JSON errors raise so they aren't cached.
+    """
+    resp = _reddit_session().get(link.rstrip("/") + ".json", timeout=15)
+    if resp.status_code >= 400:
+        return False, None
+    data = resp.json()
+    post = None
+    if isinstance(data, list) and data:
+        children = data[0].get("data", {}).get("children", [])
+        if children:
+            post = children[0].get("data", {})
+    return True, (post.get("created_utc") if post else None)
+
+
 def filter_recent_reddit_results(results: list, max_age_days: int = 60) -> tuple:
     """Drop Reddit results older than max_age_days using Reddit JSON endpoints."""
     import json
     import requests
 
     cutoff = datetime.now(timezone.utc).timestamp() - (max_age_days * 86400)
+    reddit_links = list(dict.fromkeys(
+        result.get("link", "") for result in results
+        if "reddit.com" in result.get("link", "")
+    ))
+
+    def lookup(link):
+        try:
+            return _reddit_post_created(link)
+        except (requests.RequestException, json.JSONDecodeError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=REDDIT_FETCH_WORKERS) as executor:
+        lookups = dict(zip(reddit_links, executor.map(lookup, reddit_links)))
+
     filtered = []
     meta = {}
-
     for result in results:
         link = result.get("link", "")
-        if "reddit.com" not in link:
+        if link not in lookups:
             filtered.append(result)
             continue
-        json_url = link.rstrip("/") + ".json"
-        try:
-            resp = requests.get(json_url, headers={"User-Agent": "LeadFinderBot/1.0"}, timeout=15)
-            if resp.status_code >= 400:
-                filtered.append(result)
-                continue
-            data = resp.json()
-            post = None
-            if isinstance(data, list) and data:
-                children = data[0].get("data", {}).get("children", [])
-                if children:
-                    post = children[0].get("data", {})
-            created = post.get("created_utc") if post else None
-            if created:
-                meta[link] = created
-            if created and created >= cutoff:
-                filtered.append(result)
-            # If we cannot verify recency, drop it for strictness.
-        except (requests.RequestException, json.JSONDecodeError):
-            pass
-
-        time.sleep(0.2)
+        if lookups[link] is None:
+            continue
+        reachable, created = lookups[link]
+        if not reachable:
+            filtered.append(result)
+            continue
+        if created:
+            meta[link] = created
+        if created and created >= cutoff:
+            filtered.append(result)
+        # If we cannot verify recency, drop it for strictness.
 
     return filtered, meta
 
 
-def result_matches_keywords(result: dict, keywords: list) -> bool:
-    """Return True if result text includes at least one keyword."""
-    if not keywords:
-        return True
-    combined = f"{result.get('title', '')} {result.get('snippet', '')}".lower()
-    return any(kw.lower() in combined for kw in keywords)
+# Fields read from each search result
+RESULT_FIELDS = ("title", "snippet", "link")
 
 
-def filter_results_by_intent_and_keywords(results: list, keywords: list, intent_phrases: list) -> list:
-    """Keep results that match either template keywords or intent phrases."""
-    filtered = []
-    for result in results:
-        combined_text = f"{result.get('title', '')} {result.get('snippet', '')}"
-        keyword_match = result_matches_keywords(result, keywords)
-        intent_match = detect_intent_match(combined_text, intent_phrases)
-        if not (keyword_match or intent_match):
+def _results_frame(results: list) -> pd.DataFrame:
+    """Search results as title/snippet/link columns instead of a list of dicts."""
+    return pd.DataFrame.from_records(results, columns=RESULT_FIELDS).fillna("").astype(object)
+
+
+def _dedup_exact(contacts: list, keep=None) -> list:
+    """
+    Drop exact intra-batch duplicates keyed on normalized url/email/phone.
+
+    If keep is given, contacts for which keep(contact) is falsy are skipped
+    in the same pass.
+    """
+    seen = set()
+    unique = []
+    for contact in contacts:
+        if keep is not None and not keep(contact):
+            continue
+        key_text = "|".join((
+            (contact.get('website_url') or '').lower().strip(),
+            (contact.get('email') or '').lower().strip(),
+            (contact.get('phone') or '').strip()
+        ))
+        key = hashlib.sha1(key_text.encode()).digest()[:8]
+        if key in seen:
             continue
-        filtered.append(result)
-    return filtered
+        seen.add(key)
+        unique.append(contact)
+    return unique
+
+
+def _result_texts(results: list) -> pd.Series:
+    """Lowercased "title snippet" text for each result, built once per batch."""
+    return pd.Series(
+        [f"{result.get('title', '')} {result.get('snippet', '')}" for result in results],
+        dtype=object
+    ).str.lower()
+
+
+def _phrase_pattern(phrases: list, lowercase: bool = False):
+    """Compile phrases into one escaped alternation (None if there are none)."""
+    if not phrases:
+        return None
+    if lowercase:
+        phrases = [phrase.lower() for phrase in phrases]
+    return re.compile("|".join(re.escape(phrase) for phrase in phrases))
+
+
+def _phrase_mask(texts: pd.Series, pattern) -> np.ndarray:
+    """Vectorized any(phrase in text) over a column for a compiled pattern."""
+    if pattern is None or texts.empty:
+        return np.zeros(len(texts), dtype=bool)
+    return texts.str.contains(pattern, regex=True).to_numpy(dtype=bool, copy=True)
+
+
+def _keyword_mask(texts: pd.Series, pattern) -> np.ndarray:
+    """Keyword matches over a column; a template without keywords matches everything."""
+    if pattern is None:
+        return np.ones(len(texts), dtype=bool)
+    return _phrase_mask(texts, pattern)
+
+
+def filter_results_by_intent_and_keywords(results: list, keyword_re, intent_re) -> list:
+    """
+    Keep results that match either template keywords or intent phrases.
+
+    keyword_re/intent_re come from _phrase_pattern so they are compiled once
+    per search rather than per call.
+    """
+    if keyword_re is None:
+        # A template without keywords lets every result through
+        return results
+    texts = _result_texts(results)
+    keep = _keyword_mask(texts, keyword_re)
+    if intent_re is not None and not keep.all():
+        # Only results that missed on keywords need the intent scan
+        keep[~keep] = _phrase_mask(texts[~keep], intent_re)
+    return [result for result, matched in zip(results, keep) if matched]
+
+
+def _cse_contacts(ranked: pd.DataFrame, locations: list, keyword_re, intent_re, reddit_meta: dict) -> list:
+    """
+    Contacts for CSE results (a _results_frame), with match flags, source and
+    post date filled in.
+
+    The derived fields are computed as whole columns over the batch instead of
+    per contact dict.
+    """
+    titles, snippets, links = ranked["title"], ranked["snippet"], ranked["link"]
+    frame = pd.DataFrame([
+        ContactExtractor.extract_contact_info(title=title, snippet=snippet, link=link)
+        for title, snippet, link in zip(titles, snippets, links)
+    ], dtype=object)
+    texts = (titles + " " + snippets).str.lower()
+
+    frame["location_match"] = _location_mask(
+        titles + " " + snippets + " " + links, *location_patterns(tuple(locations))
+    )
+    frame["intent_match"] = _phrase_mask(texts, intent_re)
+    frame["keyword_match"] = _keyword_mask(texts, keyword_re)
+    frame["lead_source"] = lead_sources_from_links(links).to_numpy()
+    created = pd.to_datetime(
+        pd.to_numeric(links.map(reddit_meta), errors="coerce"), unit="s", utc=True
+    )
+    # Same "+00:00" ISO form datetime.isoformat() produced for UTC timestamps
+    frame["post_created_at"] = (
+        created.dt.strftime("%Y-%m-%dT%H:%M:%S+00:00").astype(object).where(created.notna(), None)
+    )
+    return frame.to_dict("records")
 
 
 def render_search_page():
@@ -380,21 +823,14 @@ def render_search_page():
     st.sidebar.title("🔍 Search Configuration")
 
     # Template selection
-    categories = SearchTemplates.list_by_category()
-    template_options = []
-    for category, templates in categories.items():
-        for template_name in templates:
-            template = SearchTemplates.get_template(template_name)
-            template_options.append(f"{template_name} - {template['description']}")
-
-    selected_option = st.sidebar.selectbox(
+    template_labels = _template_labels()
+    template_name = st.sidebar.selectbox(
         "Search Template",
-        template_options,
+        list(template_labels),
+        format_func=template_labels.get,
         help="Choose what type of leads you want to find"
     )
-
-    template_name = selected_option.split(" - ")[0]
-    template = SearchTemplates.get_template(template_name)
+    template = _get_template_cached(template_name)
 
     with st.sidebar.expander("ℹ️ Template Info", expanded=False):
         st.write(f"**Description:** {template['description']}")
@@ -454,17 +890,18 @@ def render_search_page():
             "craigslist.org": False
         }
 
-    # Select all / deselect all buttons
+    # Select all / deselect all buttons. These run before the checkboxes are
+    # created, so writing the widget keys here takes effect in this same run.
     col1, col2 = st.sidebar.columns(2)
     if col1.button("✓ All", key="select_all", use_container_width=True):
         for site in available_sites:
             st.session_state.site_selection[site] = True
-        st.rerun()
+            st.session_state[f"site_{site}_{location_preset}"] = True
 
     if col2.button("✗ None", key="deselect_all", use_container_width=True):
         for site in available_sites:
             st.session_state.site_selection[site] = False
-        st.rerun()
+            st.session_state[f"site_{site}_{location_preset}"] = False
 
     # Site checkboxes
     selected_sites = []
@@ -473,11 +910,10 @@ def render_search_page():
         col = cols[idx % 2]
         site_name = site.replace(".com", "").replace(".org", "").title()
 
-        is_checked = col.checkbox(
-            site_name,
-            value=st.session_state.site_selection.get(site, False),
-            key=f"site_{site}_{location_preset}"
-        )
+        checkbox_key = f"site_{site}_{location_preset}"
+        if checkbox_key not in st.session_state:
+            st.session_state[checkbox_key] = st.session_state.site_selection.get(site, False)
+        is_checked = col.checkbox(site_name, key=checkbox_key)
 
         # Update state
         st.session_state.site_selection[site] = is_checked
@@ -509,6 +945,12 @@ def render_search_page():
             help="Displays counts at each filtering step."
         )
 
+        fuzzy_dedup = st.checkbox(
+            "Fuzzy duplicate detection",
+            value=False,
+            help="Also treat leads with near-identical company names as duplicates."
+        )
+
         show_new_only = st.checkbox(
             "Show only NEW leads (hide duplicates)",
             value=True,
@@ -522,7 +964,7 @@ def render_search_page():
     search_button = st.sidebar.button("🚀 Run Search", type="primary", use_container_width=True)
 
     # Main content - Database stats
-    stats = db.get_stats()
+    stats = _cached_stats()
 
     col1, col2, col3, col4, col5, col6 = st.columns(6)
     with col1:
@@ -549,6 +991,12 @@ def render_search_page():
         progress_bar = st.progress(0)
         status_text = st.empty()
 
+        # One heavy search at a time across all sessions; others queue here
+        search_lock = _search_lock()
+        if not search_lock.acquire(blocking=False):
+            status_text.text("⏳ Another search is running, waiting for it to finish...")
+            search_lock.acquire()
+
         try:
             # Initialize client(s)
             status_text.text("🔧 Initializing...")
@@ -558,43 +1006,31 @@ def render_search_page():
             places_client = None
             if use_places:
                 try:
-                    places_client = GooglePlacesClient()
+                    places_client = _places_client()
                 except Exception:
                     use_places = False
 
-            search_client = GoogleSearchClient()
+            # Fail fast on missing CSE credentials before any API calls
+            _search_client()
 
             # Build query
             status_text.text("🔍 Building query...")
             progress_bar.progress(20)
 
             intent_phrases = template.get("intent_phrases", [])
-            exclude_terms = list(template["exclude_terms"])
-            reddit_subs = None
-            if "reddit.com" in selected_sites:
-                exclude_terms.extend(reddit_exclude_terms())
-                reddit_subs = build_reddit_subreddits(locations)
-
-            if set(selected_sites) != set(template['sites']):
-                query = search_client.build_query(
-                    keywords=template["keywords"],
-                    locations=locations,
-                    sites=selected_sites,
-                    email_domains=SearchTemplates.EMAIL_DOMAINS if include_emails else None,
-                    exclude_terms=exclude_terms,
-                    intent_phrases=intent_phrases,
-                    reddit_subreddits=reddit_subs
-                )
-            else:
-                query = search_client.build_query(
-                    keywords=template["keywords"],
-                    locations=locations,
-                    sites=template["sites"],
-                    email_domains=SearchTemplates.EMAIL_DOMAINS if include_emails else None,
-                    exclude_terms=exclude_terms,
-                    intent_phrases=intent_phrases,
-                    reddit_subreddits=reddit_subs
-                )
+            # Matched against lowercased title + snippet text
+            keyword_re = _phrase_pattern(template["keywords"], lowercase=True)
+            intent_re = _phrase_pattern(intent_phrases)
+            query_sites = selected_sites
+            if set(selected_sites) == set(template['sites']):
+                query_sites = template["sites"]
+
+            query = build_template_query(
+                template_name,
+                tuple(locations),
+                tuple(query_sites),
+                include_emails
+            )
 
             service_templates = {"realtors", "contractors", "investors"}
 
@@ -609,10 +1045,10 @@ def render_search_page():
                 status_text.text("📍 Searching Places (geo)...")
                 progress_bar.progress(30)
                 places_query = places_query_for_template(template_name)
-                places_raw, places_stats = places_client.search_locations(
-                    base_query=places_query,
-                    locations=locations,
-                    max_results=max_results
+                places_raw, places_stats = _cached_places_search(
+                    places_query,
+                    tuple(locations),
+                    max_results
                 )
                 results = [normalize_places_result(p) for p in places_raw]
                 results_source = "places"
@@ -634,8 +1070,7 @@ def render_search_page():
                         f"{geo_note}".strip()
                     )
                     date_restrict = "d60"
-                    results = run_cse_search(
-                        search_client,
+                    results = _cse_search(
                         query,
                         total_results=max_results,
                         delay=0.5,
@@ -647,8 +1082,7 @@ def render_search_page():
                     results_source = "cse"
             else:
                 date_restrict = "d60"
-                results = run_cse_search(
-                    search_client,
+                results = _cse_search(
                     query,
                     total_results=max_results,
                     delay=0.5,
@@ -663,12 +1097,8 @@ def render_search_page():
             raw_results_count = len(results)
             # Basic relevance filter: match either keyword or intent phrase.
             if results_source != "places":
-                results = filter_results_by_intent_and_keywords(
-                    results,
-                    template["keywords"],
-                    intent_phrases
-                )
-            ranked_results = rank_results_by_locations(results, locations)
+                results = filter_results_by_intent_and_keywords(results, keyword_re, intent_re)
+            ranked = _results_frame(rank_results_by_locations(results, locations))
             progress_bar.progress(60)
 
             if not results:
@@ -685,25 +1115,27 @@ def render_search_page():
             progress_bar.progress(70)
 
             contacts = []
-            extractor = ContactExtractor()
 
             if results_source == "places" and places_client:
-                for place in places_raw:
-                    place_id = place.get("id", "")
-                    details = {}
-                    if place_id:
-                        try:
-                            details = places_client.place_details(place_id)
-                        except Exception:
-                            details = {}
+                keyword_matches = _keyword_mask(
+                    _result_texts([
+                        {
+                            "title": place.get("displayName", {}).get("text", ""),
+                            "snippet": place.get("formattedAddress", "")
+                        }
+                        for place in places_raw
+                    ]),
+                    keyword_re
+                )
+                for idx, place in enumerate(places_raw):
                     display_name = place.get("displayName", {}).get("text", "")
                     contact_info = {
                         "first_name": None,
                         "last_name": None,
                         "company_name": display_name,
-                        "website_url": details.get("websiteUri") or normalize_places_result(place).get("link", ""),
+                        "website_url": place.get("websiteUri") or normalize_places_result(place).get("link", ""),
                         "email": None,
-                        "phone": details.get("internationalPhoneNumber", "")
+                        "phone": place.get("internationalPhoneNumber", "")
                     }
                     contact_info["location_match"] = result_matches_locations(
                         {
@@ -715,35 +1147,11 @@ def render_search_page():
                     )
                     contact_info["intent_match"] = False
                     contact_info["lead_source"] = "places"
-                    contact_info["keyword_match"] = result_matches_keywords(
-                        {
-                            "title": display_name,
-                            "snippet": place.get("formattedAddress", "")
-                        },
-                        template["keywords"]
-                    )
+                    contact_info["keyword_match"] = bool(keyword_matches[idx])
                     contact_info["post_created_at"] = None
                     contacts.append(contact_info)
             else:
-                for result in ranked_results:
-                    contact_info = extractor.extract_contact_info(
-                        title=result.get("title", ""),
-                        snippet=result.get("snippet", ""),
-                        link=result.get("link", "")
-                    )
-                    combined_text = f"{result.get('title', '')} {result.get('snippet', '')}"
-                    contact_info["location_match"] = result_matches_locations(result, locations)
-                    contact_info["intent_match"] = detect_intent_match(combined_text, intent_phrases)
-                    contact_info["lead_source"] = lead_source_from_link(result.get("link", ""))
-                    contact_info["keyword_match"] = result_matches_keywords(result, template["keywords"])
-                    created_utc = reddit_meta.get(result.get("link", ""))
-                    if created_utc:
-                        contact_info["post_created_at"] = datetime.fromtimestamp(
-                            created_utc, tz=timezone.utc
-                        ).isoformat()
-                    else:
-                        contact_info["post_created_at"] = None
-                    contacts.append(contact_info)
+                contacts = _cse_contacts(ranked, locations, keyword_re, intent_re, reddit_meta)
 
             progress_bar.progress(80)
 
@@ -756,20 +1164,18 @@ def render_search_page():
             }
 
             if results_source == "places":
-                useful_contacts = [
-                    c for c in contacts
-                    if c.get('website_url') or c.get('phone')
-                ]
+                def is_useful(c):
+                    return c.get('website_url') or c.get('phone')
             elif template_name in people_templates:
-                useful_contacts = [
-                    c for c in contacts
-                    if c.get('website_url')
-                ]
+                def is_useful(c):
+                    return c.get('website_url')
             else:
-                useful_contacts = [
-                    c for c in contacts
-                    if c.get('website_url') and (c.get('email') or c.get('phone'))
-                ]
+                def is_useful(c):
+                    return c.get('website_url') and (c.get('email') or c.get('phone'))
+
+            # Filter and drop repeats (same URL often shows up on several
+            # result pages) in a single pass
+            useful_contacts = _dedup_exact(contacts, keep=is_useful)
 
             if show_debug:
                 st.info(
@@ -786,12 +1192,26 @@ def render_search_page():
             if preview_only:
                 new_leads, duplicate_leads = useful_contacts, []
             else:
+                leads_to_save, near_duplicates = useful_contacts, []
+                if fuzzy_dedup:
+                    # Leads already stored under their URL go to add_leads so
+                    # it can count the sighting and merge new contact details
+                    stored_urls = db.get_existing_urls([lead.get('website_url') for lead in useful_contacts])
+                    leads_to_save, near_duplicates = _near_dup_index().partition(
+                        useful_contacts,
+                        exempt=lambda lead: lead.get('website_url') in stored_urls
+                    )
                 new_leads, duplicate_leads = db.add_leads(
-                    useful_contacts,
+                    leads_to_save,
                     template=template_name,
                     locations=locations,
                     api_queries_used=api_queries_used
                 )
+                if fuzzy_dedup:
+                    # Index only what was saved, so a failed save leaves it unchanged
+                    _near_dup_index().add_all(new_leads)
+                duplicate_leads = duplicate_leads + near_duplicates
+                _invalidate_db_cache()
 
             progress_bar.progress(100)
             status_text.empty()
@@ -819,14 +1239,16 @@ def render_search_page():
             if show_new_only:
                 if new_leads:
                     st.subheader("✨ New Leads Only")
-                    df = pd.DataFrame(new_leads).fillna('')
-                    display_df = apply_location_badge(df.copy())
-                    display_df = display_df[['first_name', 'last_name', 'company_name', 'website_url', 'email', 'phone']]
+                    df = pd.DataFrame.from_records(
+                        new_leads,
+                        columns=_RESULT_FRAME_COLUMNS
+                    ).convert_dtypes(dtype_backend='pyarrow')
+                    display_df = df[list(NEW_LEAD_COLUMNS)].assign(**location_badge_columns(df))
                     st.dataframe(display_df, use_container_width=True, height=400, hide_index=True)
 
                     # Download button for new leads only
-                    download_df = df[['first_name', 'last_name', 'company_name', 'website_url', 'email', 'phone']]
-                    excel_data = get_download_data(download_df, "excel")
+                    download_df = df[list(NEW_LEAD_COLUMNS)]
+                    excel_data = _export_bytes(download_df)
                     st.download_button(
                         "📥 Download New Leads (Excel)",
                         data=excel_data,
@@ -839,20 +1261,12 @@ def render_search_page():
                 # Show all results with new/duplicate badges
                 st.subheader("📊 All Results")
 
-                all_results = []
-                for lead in new_leads:
-                    lead['status'] = '✨ NEW'
-                    all_results.append(lead)
-                for lead in duplicate_leads:
-                    lead['status'] = '🔄 DUPLICATE'
-                    all_results.append(lead)
-
-                df = pd.DataFrame(all_results).fillna('')
-                display_df = apply_location_badge(df.copy())
-                for col in ['status', 'first_name', 'last_name', 'company_name', 'website_url', 'email', 'phone']:
-                    if col not in display_df.columns:
-                        display_df[col] = ''
-                display_df = display_df[['status', 'first_name', 'last_name', 'company_name', 'website_url', 'email', 'phone']]
+                statuses = ['✨ NEW'] * len(new_leads) + ['🔄 DUPLICATE'] * len(duplicate_leads)
+                df = pd.DataFrame.from_records(
+                    new_leads + duplicate_leads,
+                    columns=_RESULT_FRAME_COLUMNS
+                ).convert_dtypes(dtype_backend='pyarrow').assign(status=statuses)
+                display_df = df[list(ALL_RESULT_COLUMNS)].assign(**location_badge_columns(df))
                 st.dataframe(display_df, use_container_width=True, height=400, hide_index=True)
 
         except Exception as e:
@@ -860,6 +1274,30 @@ def render_search_page():
             status_text.empty()
             st.error(f"❌ Error: {str(e)}")
             st.exception(e)
+        finally:
+            search_lock.release()
+
+
+def _save_match_flags(df: pd.DataFrame) -> None:
+    """Write back computed match flags so later page views read them from the DB."""
+    rows = df[['id', 'location_match', 'keyword_match']].to_dict('records')
+    try:
+        db.update_match_flags(rows)
+    except Exception:
+        # Best effort: the flags are recomputed next time if this fails
+        return
+    _cached_query_leads.clear()
+
+
+def _epoch_seconds(df: pd.DataFrame, epoch_column: str, text_column: str) -> np.ndarray:
+    """
+    Timestamp as float epoch seconds (NaN if unknown), read from the DB's
+    epoch column when it provides one, else parsed from the text column.
+    """
+    if epoch_column in df.columns:
+        return pd.to_numeric(df[epoch_column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    parsed = pd.to_datetime(_column(df, text_column, None), utc=True, errors='coerce')
+    return (parsed - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy(dtype=float, na_value=np.nan)
 
 
 def render_database_page():
@@ -871,8 +1309,7 @@ def render_database_page():
     st.sidebar.title("🔍 Filters")
 
     # Get unique templates from database
-    all_leads = db.get_all_leads()
-    unique_templates = sorted(set([lead.get('template', 'Unknown') for lead in all_leads]))
+    unique_templates = _cached_templates(_data_version())
 
     # Template filter with better names
     template_display_names = {
@@ -901,17 +1338,19 @@ def render_database_page():
     # Sorting
     sort_by = st.sidebar.selectbox(
         "Sort by",
-        ["Newest First", "Oldest First", "Most Seen", "Has Email", "Has Phone", "Location Match", "Lead Score"]
+        list(DB_SORT_KEYS)
     )
 
     # Search box
     search_query = st.sidebar.text_input("🔍 Search in database", "")
     min_score = st.sidebar.slider("⭐ Min Lead Score", min_value=0, max_value=100, value=0, step=5)
+    page = st.sidebar.number_input("Page", min_value=1, value=1, step=1)
 
     st.sidebar.markdown("---")
 
     # Action buttons
     if st.sidebar.button("🔄 Refresh Data", use_container_width=True):
+        _invalidate_db_cache()
         st.rerun()
 
     export_all = st.sidebar.button("📥 Export All Leads", use_container_width=True)
@@ -919,13 +1358,15 @@ def render_database_page():
     if st.sidebar.button("🗑️ Clear Database", type="secondary", use_container_width=True):
         if st.sidebar.checkbox("⚠️ Confirm deletion"):
             db.clear_database()
+            _invalidate_db_cache()
+            _near_dup_index.clear()
             st.success("Database cleared!")
             st.rerun()
 
     st.sidebar.markdown("---")
 
     # Get database stats
-    stats = db.get_stats()
+    stats = _cached_stats()
 
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
@@ -941,69 +1382,89 @@ def render_database_page():
 
     st.markdown("---")
 
-    # Get leads from database
-    leads = db.get_all_leads(template=selected_template)
+    # Template/search/sort run in SQL. Scores are computed here, so a score
+    # sort or filter (and Export All) needs every matching lead, paged below;
+    # otherwise SQL returns just this page.
+    load_all = export_all or sort_by == "Lead Score" or min_score > 0
+    if load_all:
+        leads = _cached_matching_leads(
+            selected_template, search_query, DB_SORT_KEYS[sort_by], _data_version()
+        )
+        total_matching = len(leads)
+    else:
+        leads, total_matching = _cached_query_leads(
+            selected_template, search_query, DB_SORT_KEYS[sort_by], int(page), _data_version()
+        )
 
     if not leads:
-        st.info("📭 No leads in database yet. Run a search to get started!")
+        if total_matching:
+            st.info(f"📭 No leads on page {int(page)}. Try an earlier page.")
+        else:
+            st.info("📭 No leads in database yet. Run a search to get started!")
         return
 
     # Convert to DataFrame
     df = pd.DataFrame(leads)
 
-    # Apply search filter
-    if search_query:
-        mask = df.apply(lambda row: row.astype(str).str.contains(search_query, case=False).any(), axis=1)
-        df = df[mask]
-
-    if 'location_match' not in df.columns:
-        df['location_match'] = df.apply(lead_location_match, axis=1)
+    # Older leads may lack the stored match flags; fill only those rows, and
+    # save the result when the backend returned the column but left it null.
+    persist = pd.Series(False, index=df.index)
+    for column, matcher in (('location_match', df_location_match), ('keyword_match', df_keyword_match)):
+        stored = _column(df, column, None)
+        missing = stored.isna()
+        if missing.any():
+            stored = stored.astype(object)
+            stored[missing] = matcher(df[missing]).to_numpy()
+            if column in df.columns:
+                persist |= missing
+        df[column] = stored.astype(bool)
+    if persist.any():
+        _save_match_flags(df[persist])
 
     if 'intent_match' not in df.columns:
         df['intent_match'] = False
     else:
         df['intent_match'] = df['intent_match'].fillna(False)
-    if 'keyword_match' not in df.columns:
-        df['keyword_match'] = df.apply(lead_keyword_match, axis=1)
-    else:
-        df['keyword_match'] = df['keyword_match'].fillna(False)
     if 'lead_source' not in df.columns:
         df['lead_source'] = ""
     else:
         df['lead_source'] = df['lead_source'].fillna("")
-
-    created_at = pd.to_datetime(df['created_at'], utc=True, errors='coerce')
-    post_created_at = pd.to_datetime(df.get('post_created_at'), utc=True, errors='coerce')
-    now = pd.Timestamp.utcnow()
-    recency_days = (now - created_at).dt.days
-    use_post = post_created_at.notna()
-    recency_days = recency_days.where(~use_post, (now - post_created_at).dt.days)
-    if 'lead_source' in df.columns:
-        reddit_missing = (df['lead_source'] == "reddit") & post_created_at.isna()
-        recency_days = recency_days.mask(reddit_missing, 9999)
-    df['lead_recency_days'] = recency_days.fillna(9999)
-    df = df.apply(compute_lead_score, axis=1)
+    # Low-cardinality labels: compare/sort on category codes from here on
+    df['template'] = df['template'].astype('category')
+    df['lead_source'] = df['lead_source'].astype('category')
+
+    created_ts = _epoch_seconds(df, 'created_ts', 'created_at')
+    post_ts = _epoch_seconds(df, 'post_ts', 'post_created_at')
+    has_post = ~np.isnan(post_ts)
+    # Days since the post when we know it, else since first seen; Reddit leads
+    # without a post date count as stale.
+    recency_days = (time.time() - np.where(has_post, post_ts, created_ts)) // 86400
+    reddit_missing = df['lead_source'].eq("reddit").to_numpy(dtype=bool) & ~has_post
+    recency_days = np.where(reddit_missing | np.isnan(recency_days), 9999, recency_days)
+    df['lead_recency_days'] = recency_days
+    df = compute_lead_scores(df)
 
     if min_score > 0:
         df = df[df['lead_score'] >= min_score]
 
-    # Apply sorting
-    if sort_by == "Newest First":
-        df = df.sort_values('created_at', ascending=False)
-    elif sort_by == "Oldest First":
-        df = df.sort_values('created_at', ascending=True)
-    elif sort_by == "Most Seen":
-        df = df.sort_values('times_seen', ascending=False)
-    elif sort_by == "Has Email":
-        df = df.sort_values('email', ascending=False, na_position='last')
-    elif sort_by == "Has Phone":
-        df = df.sort_values('phone', ascending=False, na_position='last')
-    elif sort_by == "Location Match":
-        df = df.sort_values(['location_match', 'created_at'], ascending=[False, False])
-    elif sort_by == "Lead Score":
-        df = df.sort_values(['lead_score', 'created_at'], ascending=[False, False])
-
-    display_df = apply_quality_badges(df.copy())
+    # Apply sorting. SQL already ordered the rows; these re-sort them on
+    # computed/boolean keys (text columns sort lexicographically in SQL).
+    if sort_by in PAGE_SORT_KEYS:
+        sort_columns, ascending = PAGE_SORT_KEYS[sort_by]
+        df = df.assign(
+            _has_email=df['email'].fillna('').ne(''),
+            _has_phone=df['phone'].fillna('').ne('')
+        ).sort_values(sort_columns, ascending=ascending).drop(columns=['_has_email', '_has_phone'])
+
+    # Every matching lead was loaded: count after the score filter, then page
+    matching_df = df
+    if load_all:
+        total_matching = len(df)
+        start = (int(page) - 1) * LEADS_PAGE_SIZE
+        df = df.iloc[start:start + LEADS_PAGE_SIZE]
+        if df.empty and total_matching:
+            st.info(f"📭 No leads on page {int(page)}. Try an earlier page.")
+            return
 
     # Display columns
     display_columns = [
@@ -1012,9 +1473,11 @@ def render_database_page():
         'email', 'phone', 'website_url',
         'template', 'times_seen', 'created_at'
     ]
+    display_df = df[display_columns].assign(**quality_badge_columns(df))
 
     # Show results
-    st.subheader(f"📊 Showing {len(df)} leads")
+    total_pages = max(1, -(-total_matching // LEADS_PAGE_SIZE))
+    st.subheader(f"📊 Showing {len(df)} of {total_matching} leads (page {int(page)} of {total_pages})")
 
     # Column configuration for better display
     column_config = {
@@ -1025,7 +1488,7 @@ def render_database_page():
     }
 
     st.dataframe(
-        display_df[display_columns],
+        _arrow_table(display_df),
         use_container_width=True,
         height=500,
         hide_index=True,
@@ -1034,15 +1497,25 @@ def render_database_page():
 
     # Export functionality
     if export_all or st.button("📥 Export Current View"):
-        export_df = df[['first_name', 'last_name', 'company_name', 'website_url', 'email', 'phone']]
-        excel_data = get_download_data(export_df, "excel")
-
-        st.download_button(
-            "📥 Download as Excel",
-            data=excel_data,
-            file_name=f"all_leads_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        # Export All covers every lead matching the filters, not just this page
+        export_df = (matching_df if export_all else df)[list(NEW_LEAD_COLUMNS)]
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "📥 Download as Excel",
+                data=_export_bytes(export_df),
+                file_name=f"all_leads_{timestamp}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+        with col2:
+            st.download_button(
+                "📥 Download as Parquet",
+                data=_export_bytes(export_df, "parquet"),
+                file_name=f"all_leads_{timestamp}.parquet",
+                mime="application/vnd.apache.parquet"
+            )
 
 
 def main():
@@ -1081,11 +1554,7 @@ def main():
 
     # Footer
     st.markdown("---")
-    st.markdown("""
-    <div style="text-align: center; color: #666;">
-        <p>Real Estate Lead Finder Pro | Built with Streamlit | Powered by Google Custom Search API</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_FOOTER_BLOCK, unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
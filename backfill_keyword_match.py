@@ -4,48 +4,87 @@ Backfill keyword_match in Supabase leads using page text + template keywords.
 Reads SUPABASE_URL and SUPABASE_KEY from environment (supports .env via dotenv).
 """
 import os
-import time
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import requests
-from bs4 import BeautifulSoup
+import urllib3
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from selectolax.lexbor import LexborHTMLParser
 from supabase import create_client
 
 from search_templates import SearchTemplates
+from lead_updates import flush_lead_updates
 
 load_dotenv()
 
 DEFAULT_TIMEOUT = 20
+# Pending rows per flush when writing results back
+UPDATE_BATCH_SIZE = 500
 MAX_TEXT_CHARS = 20000
+# Bytes of HTML read per page; text past this is cut by MAX_TEXT_CHARS anyway
+MAX_PAGE_BYTES = 200_000
+MAX_WORKERS = 16
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/121.0.0.0 Safari/537.36"
+)
+
+
+def make_session() -> requests.Session:
+    """Keep-alive session with a connection pool sized for MAX_WORKERS threads."""
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def html_to_text(html: str) -> str:
+    """Visible page text (script/style/noscript dropped), whitespace-joined."""
+    tree = LexborHTMLParser(html)
+    for node in tree.css("script, style, noscript"):
+        node.decompose()
+    if tree.root is None:
+        return ""
+    return " ".join(tree.root.text(separator=" ", strip=True).split())
 
 
-def fetch_page_text(url: str, timeout: int = DEFAULT_TIMEOUT) -> str:
+def fetch_page_text(url: str, timeout: int = DEFAULT_TIMEOUT, session: requests.Session = None) -> str:
     if not url or not url.startswith(("http://", "https://")):
         return ""
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/121.0.0.0 Safari/537.36"
-        )
-    }
+    headers = {"User-Agent": USER_AGENT}
     try:
-        resp = requests.get(url, headers=headers, timeout=timeout)
-        if resp.status_code >= 400:
-            return ""
-        soup = BeautifulSoup(resp.text, "lxml")
-        for tag in soup(["script", "style", "noscript"]):
-            tag.decompose()
-        text = " ".join(soup.stripped_strings)
-        return text[:MAX_TEXT_CHARS]
-    except requests.RequestException:
+        with (session or requests).get(url, headers=headers, timeout=timeout, stream=True) as resp:
+            if resp.status_code >= 400:
+                return ""
+            if not resp.headers.get("Content-Type", "text/html").startswith("text/"):
+                return ""
+            raw = resp.raw.read(MAX_PAGE_BYTES, decode_content=True)
+            html = raw.decode(resp.encoding or "utf-8", errors="replace")
+        return html_to_text(html)[:MAX_TEXT_CHARS]
+    except (requests.RequestException, urllib3.exceptions.HTTPError):
         return ""
 
 
-def matches_keywords(text: str, keywords: list) -> bool:
+@lru_cache(maxsize=64)
+def keyword_regex(template: str):
+    """Case-insensitive alternation of a template's keywords, or None if it has none."""
+    try:
+        keywords = SearchTemplates.get_template(template).get("keywords", [])
+    except Exception:
+        keywords = []
     if not keywords:
-        return True
-    text_lower = (text or "").lower()
-    return any(kw.lower() in text_lower for kw in keywords)
+        return None
+    return re.compile("|".join(re.escape(kw) for kw in keywords), re.IGNORECASE)
+
+
+def matches_keywords(text: str, template: str) -> bool:
+    pattern = keyword_regex(template)
+    return pattern is None or bool(pattern.search(text or ""))
 
 
 def load_all_leads(supabase):
@@ -77,22 +116,22 @@ def main() -> int:
     supabase = create_client(supabase_url, supabase_key)
     leads = load_all_leads(supabase)
 
+    session = make_session()
+    urls = [lead.get("website_url") or "" for lead in leads]
+
     updated = 0
-    for lead in leads:
-        template = lead.get("template") or ""
-        try:
-            tmpl = SearchTemplates.get_template(template)
-        except Exception:
-            tmpl = {"keywords": []}
-
-        url = lead.get("website_url") or ""
-        page_text = fetch_page_text(url)
-        combined = f"{lead.get('company_name') or ''} {page_text} {url}"
-        keyword_match = matches_keywords(combined, tmpl.get("keywords", []))
-
-        supabase.table("leads").update({"keyword_match": bool(keyword_match)}).eq("id", lead.get("id")).execute()
-        updated += 1
-        time.sleep(0.1)
+    pending = []
+    # Pages are fetched concurrently; matching and DB writes stay on this thread
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        page_texts = executor.map(lambda url: fetch_page_text(url, session=session), urls)
+        for lead, url, page_text in zip(leads, urls, page_texts):
+            combined = f"{lead.get('company_name') or ''} {page_text} {url}"
+            keyword_match = matches_keywords(combined, lead.get("template") or "")
+
+            pending.append({"id": lead.get("id"), "keyword_match": bool(keyword_match)})
+            if len(pending) >= UPDATE_BATCH_SIZE:
+                updated += flush_lead_updates(supabase, pending, "keyword_match")
+    updated += flush_lead_updates(supabase, pending, "keyword_match")
 
     print(f"Backfill complete. Updated {updated} leads.")
     return 0
@@ -5,13 +5,33 @@ Reads SUPABASE_URL and SUPABASE_KEY from environment.
 """
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from supabase import create_client
+from urllib3.util.retry import Retry
+
+from lead_updates import flush_lead_updates
 
 DEFAULT_TIMEOUT = 20
+# Pending rows per flush when writing results back
+UPDATE_BATCH_SIZE = 500
+# Reddit rate limits per IP; keep the fan-out modest
+MAX_WORKERS = 8
+
+# One keep-alive session shared by all lookups, so each worker reuses its
+# TLS connection to reddit.com instead of handshaking per URL
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = "LeadFinderBot/1.0"
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+))
 
 
-def load_all_leads(supabase):
+def load_reddit_leads(supabase):
+    """Leads with a reddit.com URL, filtered server-side so other rows never load."""
     all_rows = []
     offset = 0
     batch_size = 500
@@ -19,6 +39,8 @@ def load_all_leads(supabase):
         res = (
             supabase.table("leads")
             .select("id,website_url")
+            .ilike("website_url", "*reddit.com*")
+            .order("id")
             .range(offset, offset + batch_size - 1)
             .execute()
         )
@@ -35,11 +57,7 @@ def fetch_reddit_created_utc(url: str) -> float:
         return 0
     json_url = url.rstrip("/") + ".json"
     try:
-        resp = requests.get(
-            json_url,
-            headers={"User-Agent": "LeadFinderBot/1.0"},
-            timeout=DEFAULT_TIMEOUT
-        )
+        resp = _SESSION.get(json_url, timeout=DEFAULT_TIMEOUT)
         if resp.status_code >= 400:
             return 0
         data = resp.json()
@@ -61,20 +79,23 @@ def main() -> int:
         return 1
 
     supabase = create_client(supabase_url, supabase_key)
-    leads = load_all_leads(supabase)
+    reddit_leads = load_reddit_leads(supabase)
 
     updated = 0
-    for lead in leads:
-        url = lead.get("website_url") or ""
-        if "reddit.com" not in url:
-            continue
-        created_utc = fetch_reddit_created_utc(url)
-        if not created_utc:
-            continue
-        iso = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(created_utc))
-        supabase.table("leads").update({"post_created_at": iso}).eq("id", lead.get("id")).execute()
-        updated += 1
-        time.sleep(0.2)
+    pending = []
+    # Lookups run concurrently; DB writes stay on this thread
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        created = executor.map(
+            fetch_reddit_created_utc, [lead.get("website_url") or "" for lead in reddit_leads]
+        )
+        for lead, created_utc in zip(reddit_leads, created):
+            if not created_utc:
+                continue
+            iso = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(created_utc))
+            pending.append({"id": lead.get("id"), "post_created_at": iso})
+            if len(pending) >= UPDATE_BATCH_SIZE:
+                updated += flush_lead_updates(supabase, pending, "post_created_at")
+    updated += flush_lead_updates(supabase, pending, "post_created_at")
 
     print(f"Backfill complete. Updated {updated} reddit leads with post_created_at.")
     return 0
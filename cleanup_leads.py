@@ -5,41 +5,58 @@ Cleanup Supabase leads with strict rules:
 Default is dry-run; use --apply to delete.
 """
 import argparse
+import atexit
 import os
 import time
-from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from dotenv import load_dotenv
+from lxml import etree, html
+from requests.adapters import HTTPAdapter
 from supabase import create_client
+from urllib3.util.retry import Retry
+
+from lead_updates import flush_lead_updates
 
 load_dotenv()
 
 DEFAULT_TIMEOUT = 20
 REDDIT_MAX_AGE_DAYS = 60
+# Reddit rate limits per IP; keep the fan-out modest
+MAX_WORKERS = 8
+# Lead ids per DELETE ... IN (...) request; keeps the request URL short
+DELETE_BATCH_SIZE = 200
+PAGE_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/121.0.0.0 Safari/537.36"
+)
+
+# Keep-alive session shared by all fetches (most lookups hit reddit.com)
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = "LeadFinderBot/1.0"
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=32, max_retries=Retry(total=2, backoff_factor=0.3))
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+atexit.register(_SESSION.close)
 
 
 def fetch_page_text(url: str, timeout: int = DEFAULT_TIMEOUT) -> str:
     if not url or not url.startswith(("http://", "https://")):
         return ""
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/121.0.0.0 Safari/537.36"
-        )
-    }
     try:
-        resp = requests.get(url, headers=headers, timeout=timeout)
+        resp = _SESSION.get(url, headers={"User-Agent": PAGE_USER_AGENT}, timeout=timeout)
         if resp.status_code >= 400:
             return ""
-        soup = BeautifulSoup(resp.text, "lxml")
-        for tag in soup(["script", "style", "noscript"]):
-            tag.decompose()
-        text = " ".join(soup.stripped_strings)
+        # lxml straight from bytes: no BeautifulSoup tree on top of the parse
+        tree = html.fromstring(resp.content)
+        etree.strip_elements(tree, "script", "style", "noscript", with_tail=False)
+        text = " ".join(s for s in (part.strip() for part in tree.itertext()) if s)
         return text[:20000]
-    except requests.RequestException:
+    except (requests.RequestException, etree.ParserError):
         return ""
 
 
@@ -48,7 +65,7 @@ def fetch_reddit_created_utc(url: str) -> float:
         return 0
     json_url = url.rstrip("/") + ".json"
     try:
-        resp = requests.get(json_url, headers={"User-Agent": "LeadFinderBot/1.0"}, timeout=DEFAULT_TIMEOUT)
+        resp = _SESSION.get(json_url, timeout=DEFAULT_TIMEOUT)
         if resp.status_code >= 400:
             return 0
         data = resp.json()
@@ -62,7 +79,21 @@ def fetch_reddit_created_utc(url: str) -> float:
     return 0
 
 
-def load_all_leads(supabase) -> List[Dict]:
+def load_reddit_candidates(supabase, cutoff: datetime) -> List[Dict]:
+    """
+    Reddit leads whose stored post_created_at is before cutoff or missing.
+    Leads with a recent stored date can't be deleted, so they aren't loaded.
+    """
+    # post_created_at is a timestamp without time zone holding UTC
+    cutoff_str = cutoff.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    # One filter param holding both conditions: (Reddit) AND (old OR undated).
+    # The builder only exposes or_, so the AND is nested inside it.
+    candidate_filter = (
+        'and('
+        'or(lead_source.eq.reddit,website_url.ilike."*reddit.com*"),'
+        f'or(post_created_at.lt."{cutoff_str}",post_created_at.is.null)'
+        ')'
+    )
     all_rows: List[Dict] = []
     offset = 0
     batch_size = 500
@@ -70,6 +101,8 @@ def load_all_leads(supabase) -> List[Dict]:
         res = (
             supabase.table("leads")
             .select("id,template,company_name,website_url,post_created_at,lead_source")
+            .or_(candidate_filter)
+            .order("id")
             .range(offset, offset + batch_size - 1)
             .execute()
         )
@@ -81,12 +114,35 @@ def load_all_leads(supabase) -> List[Dict]:
     return all_rows
 
 
-def should_delete(lead: Dict) -> Tuple[bool, str]:
+def is_reddit_lead(lead: Dict) -> bool:
     url = lead.get("website_url") or ""
     source = (lead.get("lead_source") or "").lower()
+    return "reddit.com" in url or source == "reddit"
+
+
+def stored_created_utc(lead: Dict) -> float:
+    """Stored post_created_at as epoch seconds (0 if missing or unparseable)."""
+    value = lead.get("post_created_at")
+    if not value:
+        return 0
+    try:
+        created = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return 0
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return created.timestamp()
+
+
+def should_delete(lead: Dict, created_utc: Optional[float] = None) -> Tuple[bool, str]:
+    """
+    Apply the cleanup rules to a lead.
+
+    created_utc is the Reddit post time, stored or from
+    fetch_reddit_created_utc (0 if unknown); only read for Reddit leads.
+    """
     # Rule 1: Reddit recency
-    if "reddit.com" in url or source == "reddit":
-        created_utc = fetch_reddit_created_utc(url)
+    if is_reddit_lead(lead):
         if not created_utc:
             return True, "reddit_missing_date"
         cutoff = datetime.now(timezone.utc).timestamp() - (REDDIT_MAX_AGE_DAYS * 86400)
@@ -108,20 +164,42 @@ def main() -> int:
         return 1
 
     supabase = create_client(supabase_url, supabase_key)
-    leads = load_all_leads(supabase)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=REDDIT_MAX_AGE_DAYS)
+    leads = load_reddit_candidates(supabase, cutoff)
 
     to_delete = []
     reasons: Dict[str, int] = {}
 
-    for lead in leads:
-        delete, reason = should_delete(lead)
+    # Stored post dates decide most leads; only those without one are looked
+    # up on Reddit, concurrently up front
+    created_utcs = [stored_created_utc(lead) for lead in leads]
+    missing_indexes = [i for i, created_utc in enumerate(created_utcs) if not created_utc]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        created = executor.map(
+            fetch_reddit_created_utc, [leads[i].get("website_url") or "" for i in missing_indexes]
+        )
+        for i, created_utc in zip(missing_indexes, created):
+            created_utcs[i] = created_utc
+
+    for lead, created_utc in zip(leads, created_utcs):
+        delete, reason = should_delete(lead, created_utc)
         if delete:
             to_delete.append((lead, reason))
             reasons[reason] = reasons.get(reason, 0) + 1
-        time.sleep(0.15)
+
+    # Post dates found for leads that are kept; saved on --apply so later
+    # runs filter them server-side instead of looking them up again
+    delete_ids = {lead.get("id") for lead, _ in to_delete}
+    found_dates = [
+        {"id": leads[i].get("id"), "post_created_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(created_utcs[i]))}
+        for i in missing_indexes
+        if created_utcs[i] and leads[i].get("id") is not None and leads[i].get("id") not in delete_ids
+    ]
 
     print("CLEANUP REPORT")
-    print(f"Total leads scanned: {len(leads)}")
+    print(f"Reddit leads scanned (old or undated): {len(leads)}")
+    print(f"Looked up on Reddit: {len(missing_indexes)}")
+    print(f"Post dates to save: {len(found_dates)}")
     print(f"Candidates to delete: {len(to_delete)}")
     for reason, count in sorted(reasons.items(), key=lambda x: x[1], reverse=True):
         print(f"  {reason}: {count}")
@@ -134,13 +212,25 @@ def main() -> int:
         print("\nDry-run only. Re-run with --apply to delete.")
         return 0
 
+    if found_dates:
+        saved = flush_lead_updates(supabase, found_dates, "post_created_at")
+        print(f"\nSaved post_created_at for {saved} leads.")
+
     ids = [lead.get("id") for lead, _ in to_delete if lead.get("id") is not None]
     if not ids:
         print("\nNo leads to delete.")
         return 0
 
-    supabase.table("leads").delete().in_("id", ids).execute()
-    print(f"\nDeleted {len(ids)} leads.")
+    deleted = 0
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        batch = ids[start:start + DELETE_BATCH_SIZE]
+        try:
+            supabase.table("leads").delete().in_("id", batch).execute()
+        except Exception as exc:
+            print(f"\nDelete failed after {deleted} of {len(ids)} leads: {exc}")
+            return 1
+        deleted += len(batch)
+    print(f"\nDeleted {deleted} leads.")
     return 0
 
 
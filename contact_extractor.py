@@ -2,7 +2,7 @@
 Module for extracting contact information from text using regex patterns.
 """
 import re
-from typing import Dict, Optional, List
+from typing import Dict, Iterator, Optional, List
 
 
 class ContactExtractor:
@@ -13,32 +13,89 @@ class ContactExtractor:
         r'\b[A-Za-z0-9._%+-]+@(?:gmail|outlook|hotmail|live|yahoo|icloud|me|aol|comcast|verizon|att)\.(?:com|net)\b',
         re.IGNORECASE
     )
+    # The provider half of EMAIL_PATTERN, checked at each '@' before the
+    # local part is matched (so long runs without a valid '@' aren't backtracked)
+    EMAIL_DOMAIN_PATTERN = re.compile(
+        r'@(?:gmail|outlook|hotmail|live|yahoo|icloud|me|aol|comcast|verizon|att)\.(?:com|net)\b',
+        re.IGNORECASE
+    )
+    EMAIL_LOCAL_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-')
 
     # Phone number patterns (US format)
     PHONE_PATTERN = re.compile(
         r'(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b'
     )
 
+    # PHONE_PATTERN's non-digit characters other than whitespace
+    PHONE_PUNCTUATION = str.maketrans('', '', '+-.()')
+
+    # Company names: "at/with [Company]" first, then any "[Company] Realty"
+    COMPANY_PATTERNS = (
+        re.compile(r'(?:at|with|@)\s+([A-Z][A-Za-z\s&]+(?:Realty|Properties|Homes|Group|Team|Real Estate))'),
+        re.compile(r'([A-Z][A-Za-z\s&]+(?:Realty|Properties|Homes|Group|Team|Real Estate))'),
+    )
+    # Every company pattern ends in one of these, so text without them is skipped
+    COMPANY_SUFFIX_PATTERN = re.compile(r'Realty|Properties|Homes|Group|Team|Real Estate')
+
+    # Title cleanup: drop "| Site" / "- Tagline" tails and "@handle (...)" parts
+    TITLE_SEPARATOR_PATTERN = re.compile(r'[|—\-]+.*$')
+    TITLE_HANDLE_PATTERN = re.compile(r'\s*[@()]\s*.*$')
+    CAPITALIZED_WORD_PATTERN = re.compile(r'\b[A-Z][a-z]+\b')
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+
     # Common business/personal name indicators
     NAME_STOPWORDS = {
         'inc', 'llc', 'ltd', 'corp', 'company', 'group', 'team',
         'realty', 'properties', 'homes', 'real estate', 'realtor'
     }
 
+    @staticmethod
+    def _iter_emails(text: str) -> Iterator[str]:
+        """
+        Yield EMAIL_PATTERN matches in order, as findall would.
+
+        Only '@' signs followed by a known provider are considered, and
+        EMAIL_PATTERN then runs over just that address's span.
+        """
+        local_chars = ContactExtractor.EMAIL_LOCAL_CHARS
+        searched_to = 0
+        at = text.find('@')
+        while at != -1:
+            domain = ContactExtractor.EMAIL_DOMAIN_PATTERN.match(text, at)
+            if domain:
+                start = at
+                while start > searched_to and text[start - 1] in local_chars:
+                    start -= 1
+                match = ContactExtractor.EMAIL_PATTERN.search(text, start, domain.end())
+                if match:
+                    yield match.group(0)
+                    searched_to = match.end()
+            at = text.find('@', at + 1)
+
     @staticmethod
     def extract_email(text: str) -> Optional[str]:
         """Extract the first valid email address from text."""
         if not text:
             return None
-        match = ContactExtractor.EMAIL_PATTERN.search(text)
-        return match.group(0) if match else None
+        return next(ContactExtractor._iter_emails(text), None)
 
     @staticmethod
     def extract_all_emails(text: str) -> List[str]:
         """Extract all valid email addresses from text."""
         if not text:
             return []
-        return ContactExtractor.EMAIL_PATTERN.findall(text)
+        return list(ContactExtractor._iter_emails(text))
+
+    @staticmethod
+    def _format_phone(match: str) -> Optional[str]:
+        """Normalize a PHONE_PATTERN match, or None if it isn't 10/11 digits."""
+        # Strip punctuation, then whitespace: what remains are the digits
+        phone = ''.join(match.translate(ContactExtractor.PHONE_PUNCTUATION).split())
+        if len(phone) == 10:
+            return f"({phone[:3]}) {phone[3:6]}-{phone[6:]}"
+        elif len(phone) == 11 and phone[0] == '1':
+            return f"+1 ({phone[1:4]}) {phone[4:7]}-{phone[7:]}"
+        return None
 
     @staticmethod
     def extract_phone(text: str) -> Optional[str]:
@@ -46,29 +103,18 @@ class ContactExtractor:
         if not text:
             return None
         match = ContactExtractor.PHONE_PATTERN.search(text)
-        if match:
-            # Normalize phone format
-            phone = re.sub(r'[^\d]', '', match.group(0))
-            if len(phone) == 10:
-                return f"({phone[:3]}) {phone[3:6]}-{phone[6:]}"
-            elif len(phone) == 11 and phone[0] == '1':
-                return f"+1 ({phone[1:4]}) {phone[4:7]}-{phone[7:]}"
-        return None
+        return ContactExtractor._format_phone(match.group(0)) if match else None
 
     @staticmethod
     def extract_all_phones(text: str) -> List[str]:
         """Extract all valid phone numbers from text."""
         if not text:
             return []
-        phones = []
-        matches = ContactExtractor.PHONE_PATTERN.findall(text)
-        for match in matches:
-            phone = re.sub(r'[^\d]', '', match)
-            if len(phone) == 10:
-                phones.append(f"({phone[:3]}) {phone[3:6]}-{phone[6:]}")
-            elif len(phone) == 11 and phone[0] == '1':
-                phones.append(f"+1 ({phone[1:4]}) {phone[4:7]}-{phone[7:]}")
-        return phones
+        phones = (
+            ContactExtractor._format_phone(match)
+            for match in ContactExtractor.PHONE_PATTERN.findall(text)
+        )
+        return [phone for phone in phones if phone]
 
     @staticmethod
     def extract_name_from_title(title: str) -> Dict[str, Optional[str]]:
@@ -80,11 +126,11 @@ class ContactExtractor:
             return {"first_name": None, "last_name": None}
 
         # Remove common separators and extra info
-        title = re.sub(r'[|—\-]+.*$', '', title)
-        title = re.sub(r'\s*[@()]\s*.*$', '', title)
+        title = ContactExtractor.TITLE_SEPARATOR_PATTERN.sub('', title)
+        title = ContactExtractor.TITLE_HANDLE_PATTERN.sub('', title)
 
         # Extract potential names (capitalized words)
-        words = re.findall(r'\b[A-Z][a-z]+\b', title)
+        words = ContactExtractor.CAPITALIZED_WORD_PATTERN.findall(title)
 
         # Filter out common business words
         names = [w for w in words if w.lower() not in ContactExtractor.NAME_STOPWORDS]
@@ -102,21 +148,16 @@ class ContactExtractor:
         Extract company name from text.
         Looks for patterns like "at CompanyName" or "CompanyName Realty"
         """
-        if not text:
+        if not text or not ContactExtractor.COMPANY_SUFFIX_PATTERN.search(text):
             return None
 
         # Look for "at [Company]" or "with [Company]" patterns
-        patterns = [
-            r'(?:at|with|@)\s+([A-Z][A-Za-z\s&]+(?:Realty|Properties|Homes|Group|Team|Real Estate))',
-            r'([A-Z][A-Za-z\s&]+(?:Realty|Properties|Homes|Group|Team|Real Estate))',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        for pattern in ContactExtractor.COMPANY_PATTERNS:
+            match = pattern.search(text)
             if match:
                 company = match.group(1).strip()
                 # Clean up the company name
-                company = re.sub(r'\s+', ' ', company)
+                company = ContactExtractor.WHITESPACE_PATTERN.sub(' ', company)
                 if len(company) > 3:  # Minimum length check
                     return company
 
@@ -4,8 +4,10 @@ Auto-detects and uses Supabase (cloud) or SQLite (local).
 """
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Sequence, Set, Tuple
 import hashlib
 
 
@@ -53,9 +55,35 @@ def get_database():
 class LeadDatabase:
     """Manage leads database with duplicate detection (SQLite backend)."""
 
+    # Text columns matched by query_leads(search=...)
+    SEARCH_COLUMNS = (
+        'first_name', 'last_name', 'company_name',
+        'email', 'phone', 'website_url', 'template'
+    )
+
+    # ORDER BY clauses for query_leads(sort_by=...)
+    SORT_ORDERS = {
+        'newest': "created_at DESC",
+        'oldest': "created_at ASC",
+        'most_seen': "times_seen DESC, created_at DESC",
+        'has_email': "(email IS NULL OR email = ''), created_at DESC",
+        'has_phone': "(phone IS NULL OR phone = ''), created_at DESC",
+        'location_match': "location_match DESC, created_at DESC",
+    }
+
+    # Timestamps as integer epoch seconds, so callers can skip date parsing
+    EPOCH_COLUMNS = (
+        "CAST(strftime('%s', created_at) AS INTEGER) AS created_ts, "
+        "CAST(strftime('%s', post_created_at) AS INTEGER) AS post_ts"
+    )
+
     def __init__(self, db_path: str = "data/leads.db"):
         """Initialize database connection."""
         self.db_path = db_path
+        # One connection shared by every thread (Streamlit reruns on fresh
+        # threads), opened on first use; _lock serializes access to it
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
 
         # Create data directory if it doesn't exist
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
@@ -63,82 +91,114 @@ class LeadDatabase:
         # Initialize database
         self._init_db()
 
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        The shared connection, held under _lock for the with-block.
+
+        Opened with tuned PRAGMAs on first use. A transaction left open by
+        an exception is rolled back, as closing the connection used to.
+        """
+        with self._lock:
+            if self._conn is None:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA mmap_size=268435456")
+                conn.execute("PRAGMA temp_store=MEMORY")
+                self._conn = conn
+            try:
+                yield self._conn
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                raise
+
+    def close(self) -> None:
+        """Close the shared connection (reopened on next use)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def _init_db(self):
         """Create tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Leads table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS leads (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT,
-                last_name TEXT,
-                company_name TEXT,
-                website_url TEXT UNIQUE,
-                email TEXT,
-                phone TEXT,
-                template TEXT,
-                locations TEXT,
-                location_match INTEGER DEFAULT 0,
-                intent_match INTEGER DEFAULT 0,
-                lead_source TEXT,
-                post_created_at TIMESTAMP,
-                keyword_match INTEGER DEFAULT 0,
-                url_hash TEXT UNIQUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                times_seen INTEGER DEFAULT 1
-            )
-        """)
-        try:
-            cursor.execute("ALTER TABLE leads ADD COLUMN location_match INTEGER DEFAULT 0")
-        except sqlite3.OperationalError:
-            pass
-        try:
-            cursor.execute("ALTER TABLE leads ADD COLUMN intent_match INTEGER DEFAULT 0")
-        except sqlite3.OperationalError:
-            pass
-        try:
-            cursor.execute("ALTER TABLE leads ADD COLUMN lead_source TEXT")
-        except sqlite3.OperationalError:
-            pass
-        try:
-            cursor.execute("ALTER TABLE leads ADD COLUMN post_created_at TIMESTAMP")
-        except sqlite3.OperationalError:
-            pass
-        try:
-            cursor.execute("ALTER TABLE leads ADD COLUMN keyword_match INTEGER DEFAULT 0")
-        except sqlite3.OperationalError:
-            pass
-
-        # Search history table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS search_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                template TEXT,
-                locations TEXT,
-                num_results INTEGER,
-                new_leads INTEGER,
-                duplicate_leads INTEGER,
-                api_queries_used INTEGER DEFAULT 0,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # Create indexes for faster lookups
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_url_hash ON leads(url_hash)
-        """)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_email ON leads(email)
-        """)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_website_url ON leads(website_url)
-        """)
-
-        conn.commit()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+
+            # WAL lets the dashboard read while a search is writing
+            cursor.execute("PRAGMA journal_mode=WAL")
+
+            # Leads table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS leads (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    first_name TEXT,
+                    last_name TEXT,
+                    company_name TEXT,
+                    website_url TEXT UNIQUE,
+                    email TEXT,
+                    phone TEXT,
+                    template TEXT,
+                    locations TEXT,
+                    location_match INTEGER DEFAULT 0,
+                    intent_match INTEGER DEFAULT 0,
+                    lead_source TEXT,
+                    post_created_at TIMESTAMP,
+                    keyword_match INTEGER DEFAULT 0,
+                    url_hash TEXT UNIQUE,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    times_seen INTEGER DEFAULT 1
+                )
+            """)
+            try:
+                cursor.execute("ALTER TABLE leads ADD COLUMN location_match INTEGER DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                cursor.execute("ALTER TABLE leads ADD COLUMN intent_match INTEGER DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                cursor.execute("ALTER TABLE leads ADD COLUMN lead_source TEXT")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                cursor.execute("ALTER TABLE leads ADD COLUMN post_created_at TIMESTAMP")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                cursor.execute("ALTER TABLE leads ADD COLUMN keyword_match INTEGER DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass
+
+            # Search history table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS search_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    template TEXT,
+                    locations TEXT,
+                    num_results INTEGER,
+                    new_leads INTEGER,
+                    duplicate_leads INTEGER,
+                    api_queries_used INTEGER DEFAULT 0,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # Create indexes for faster lookups
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_url_hash ON leads(url_hash)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_email ON leads(email)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_website_url ON leads(website_url)
+            """)
+
+            conn.commit()
 
     @staticmethod
     def _hash_url(url: str) -> str:
@@ -158,122 +218,173 @@ class LeadDatabase:
         Returns:
             Tuple of (new_leads, duplicate_leads)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         new_leads = []
         duplicate_leads = []
         location_str = ", ".join(locations)
 
-        for lead in leads:
-            url = lead.get('website_url', '')
-            if not url:
-                continue  # Skip if no URL
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            # Take the write lock before the duplicate check so concurrent
+            # add_leads calls can't both insert the same url_hash
+            cursor.execute("BEGIN IMMEDIATE")
 
-            url_hash = self._hash_url(url)
+            existing_hashes = self._existing_hashes(cursor, {
+                self._hash_url(lead['website_url']) for lead in leads if lead.get('website_url')
+            })
+            # New rows keyed by url_hash so repeats within the batch merge into them
+            insert_rows: Dict[str, Dict] = {}
+            update_params = []
+
+            for lead in leads:
+                url = lead.get('website_url', '')
+                if not url:
+                    continue  # Skip if no URL
+
+                url_hash = self._hash_url(url)
+
+                if url_hash in insert_rows:
+                    # Repeat of a lead inserted earlier in this batch
+                    self._merge_lead(insert_rows[url_hash], lead)
+                    duplicate_leads.append(lead)
+                elif url_hash in existing_hashes:
+                    # Update existing lead
+                    update_params.append((
+                        lead.get('email', ''),
+                        lead.get('phone', ''),
+                        lead.get('first_name', ''),
+                        lead.get('last_name', ''),
+                        lead.get('company_name', ''),
+                        1 if lead.get('location_match') else 0,
+                        1 if lead.get('intent_match') else 0,
+                        lead.get('lead_source', ''),
+                        lead.get('post_created_at', ''),
+                        1 if lead.get('keyword_match') else 0,
+                        url_hash
+                    ))
+                    duplicate_leads.append(lead)
+                else:
+                    # Insert new lead
+                    insert_rows[url_hash] = {
+                        'first_name': lead.get('first_name', ''),
+                        'last_name': lead.get('last_name', ''),
+                        'company_name': lead.get('company_name', ''),
+                        'website_url': url,
+                        'email': lead.get('email', ''),
+                        'phone': lead.get('phone', ''),
+                        'template': template,
+                        'locations': location_str,
+                        'location_match': 1 if lead.get('location_match') else 0,
+                        'intent_match': 1 if lead.get('intent_match') else 0,
+                        'lead_source': lead.get('lead_source', ''),
+                        'post_created_at': lead.get('post_created_at', ''),
+                        'keyword_match': 1 if lead.get('keyword_match') else 0,
+                        'url_hash': url_hash,
+                        'times_seen': 1
+                    }
+                    new_leads.append(lead)
+
+            cursor.executemany("""
+                UPDATE leads
+                SET last_seen = CURRENT_TIMESTAMP,
+                    times_seen = times_seen + 1,
+                    email = COALESCE(NULLIF(?, ''), email),
+                    phone = COALESCE(NULLIF(?, ''), phone),
+                    first_name = COALESCE(NULLIF(?, ''), first_name),
+                    last_name = COALESCE(NULLIF(?, ''), last_name),
+                    company_name = COALESCE(NULLIF(?, ''), company_name),
+                    location_match = CASE
+                        WHEN location_match = 1 THEN 1
+                        WHEN ? = 1 THEN 1
+                        ELSE 0
+                    END,
+                    intent_match = CASE
+                        WHEN intent_match = 1 THEN 1
+                        WHEN ? = 1 THEN 1
+                        ELSE 0
+                    END,
+                    lead_source = COALESCE(NULLIF(?, ''), lead_source),
+                    post_created_at = COALESCE(NULLIF(?, ''), post_created_at),
+                    keyword_match = CASE
+                        WHEN keyword_match = 1 THEN 1
+                        WHEN ? = 1 THEN 1
+                        ELSE 0
+                    END
+                WHERE url_hash = ?
+            """, update_params)
+
+            cursor.executemany("""
+                INSERT INTO leads (
+                    first_name, last_name, company_name,
+                    website_url, email, phone,
+                    template, locations, location_match, intent_match, lead_source,
+                    post_created_at, keyword_match, url_hash, times_seen
+                ) VALUES (
+                    :first_name, :last_name, :company_name,
+                    :website_url, :email, :phone,
+                    :template, :locations, :location_match, :intent_match, :lead_source,
+                    :post_created_at, :keyword_match, :url_hash, :times_seen
+                )
+            """, list(insert_rows.values()))
+
+            # Add to search history
+            cursor.execute("""
+                INSERT INTO search_history (
+                    template, locations, num_results, new_leads, duplicate_leads, api_queries_used
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                template,
+                location_str,
+                len(leads),
+                len(new_leads),
+                len(duplicate_leads),
+                api_queries_used
+            ))
+
+            conn.commit()
+
+            return new_leads, duplicate_leads
 
-            # Check if lead already exists
+    @staticmethod
+    def _existing_hashes(cursor: sqlite3.Cursor, url_hashes) -> set:
+        """The given url_hash values that already have a lead row."""
+        url_hashes = sorted(url_hashes)
+        found = set()
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(url_hashes), 500):
+            chunk = url_hashes[start:start + 500]
             cursor.execute(
-                "SELECT id, times_seen FROM leads WHERE url_hash = ?",
-                (url_hash,)
+                f"SELECT url_hash FROM leads WHERE url_hash IN ({','.join('?' * len(chunk))})",
+                chunk
             )
-            existing = cursor.fetchone()
-
-            if existing:
-                # Update existing lead
-                lead_id, times_seen = existing
-                cursor.execute("""
-                    UPDATE leads
-                    SET last_seen = CURRENT_TIMESTAMP,
-                        times_seen = ?,
-                        email = COALESCE(NULLIF(?, ''), email),
-                        phone = COALESCE(NULLIF(?, ''), phone),
-                        first_name = COALESCE(NULLIF(?, ''), first_name),
-                        last_name = COALESCE(NULLIF(?, ''), last_name),
-                        company_name = COALESCE(NULLIF(?, ''), company_name),
-                        location_match = CASE
-                            WHEN location_match = 1 THEN 1
-                            WHEN ? = 1 THEN 1
-                            ELSE 0
-                        END,
-                        intent_match = CASE
-                            WHEN intent_match = 1 THEN 1
-                            WHEN ? = 1 THEN 1
-                            ELSE 0
-                        END,
-                        lead_source = COALESCE(NULLIF(?, ''), lead_source),
-                        post_created_at = COALESCE(NULLIF(?, ''), post_created_at),
-                        keyword_match = CASE
-                            WHEN keyword_match = 1 THEN 1
-                            WHEN ? = 1 THEN 1
-                            ELSE 0
-                        END
-                    WHERE id = ?
-                """, (
-                    times_seen + 1,
-                    lead.get('email', ''),
-                    lead.get('phone', ''),
-                    lead.get('first_name', ''),
-                    lead.get('last_name', ''),
-                    lead.get('company_name', ''),
-                    1 if lead.get('location_match') else 0,
-                    1 if lead.get('intent_match') else 0,
-                    lead.get('lead_source', ''),
-                    lead.get('post_created_at', ''),
-                    1 if lead.get('keyword_match') else 0,
-                    lead_id
-                ))
-                duplicate_leads.append(lead)
-            else:
-                # Insert new lead
-                cursor.execute("""
-                    INSERT INTO leads (
-                        first_name, last_name, company_name,
-                        website_url, email, phone,
-                        template, locations, location_match, intent_match, lead_source,
-                        post_created_at, keyword_match, url_hash
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    lead.get('first_name', ''),
-                    lead.get('last_name', ''),
-                    lead.get('company_name', ''),
-                    url,
-                    lead.get('email', ''),
-                    lead.get('phone', ''),
-                    template,
-                    location_str,
-                    1 if lead.get('location_match') else 0,
-                    1 if lead.get('intent_match') else 0,
-                    lead.get('lead_source', ''),
-                    lead.get('post_created_at', ''),
-                    1 if lead.get('keyword_match') else 0,
-                    url_hash
-                ))
-                new_leads.append(lead)
-
-        # Add to search history
-        cursor.execute("""
-            INSERT INTO search_history (
-                template, locations, num_results, new_leads, duplicate_leads, api_queries_used
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            template,
-            location_str,
-            len(leads),
-            len(new_leads),
-            len(duplicate_leads),
-            api_queries_used
-        ))
-
-        conn.commit()
-        conn.close()
-
-        return new_leads, duplicate_leads
+            found.update(row[0] for row in cursor.fetchall())
+        return found
+
+    @staticmethod
+    def _merge_lead(row: Dict, lead: Dict) -> None:
+        """Apply a repeat sighting to a pending insert, as the UPDATE would."""
+        row['times_seen'] += 1
+        for field in ('email', 'phone', 'first_name', 'last_name', 'company_name',
+                      'lead_source', 'post_created_at'):
+            if lead.get(field):
+                row[field] = lead[field]
+        for flag in ('location_match', 'intent_match', 'keyword_match'):
+            if lead.get(flag):
+                row[flag] = 1
+
+    def get_existing_urls(self, urls: Sequence[str]) -> Set[str]:
+        """The given URLs that already have a lead row (matched by url_hash)."""
+        with self._connection() as conn:
+            found = self._existing_hashes(
+                conn.cursor(),
+                {self._hash_url(url) for url in urls if url}
+            )
+        return {url for url in urls if url and self._hash_url(url) in found}
 
     def get_all_leads(
         self,
         limit: Optional[int] = None,
-        template: Optional[str] = None
+        template: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
     ) -> List[Dict]:
         """
         Get all leads from database.
@@ -281,134 +392,220 @@ class LeadDatabase:
         Args:
             limit: Maximum number of leads to return
             template: Filter by template name
+            columns: Only return these lead fields (all if None)
 
         Returns:
             List of lead dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        query = "SELECT * FROM leads"
-        params = []
-
-        if template:
-            query += " WHERE template = ?"
-            params.append(template)
-
-        query += " ORDER BY created_at DESC"
-
-        if limit:
-            query += f" LIMIT {limit}"
-
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-
-        leads = []
-        for row in rows:
-            leads.append({
-                'id': row['id'],
-                'first_name': row['first_name'],
-                'last_name': row['last_name'],
-                'company_name': row['company_name'],
-                'website_url': row['website_url'],
-                'email': row['email'],
-                'phone': row['phone'],
-                'template': row['template'],
-                'locations': row['locations'],
-                'created_at': row['created_at'],
-                'last_seen': row['last_seen'],
-                'times_seen': row['times_seen']
-            })
+        with self._connection() as conn:
+            cursor = conn.cursor()
+
+            query = "SELECT * FROM leads"
+            params = []
+
+            if template:
+                query += " WHERE template = ?"
+                params.append(template)
+
+            query += " ORDER BY created_at DESC"
+
+            if limit:
+                query += f" LIMIT {limit}"
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+            leads = [self._row_to_lead(row, columns) for row in rows]
+
+            return leads
+
+    def query_leads(
+        self,
+        template: Optional[str] = None,
+        search: Optional[str] = None,
+        sort_by: str = "newest",
+        limit: int = 500,
+        offset: int = 0,
+        columns: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Dict], int]:
+        """
+        Get one page of leads with filtering and sorting done in SQL.
 
-        conn.close()
-        return leads
+        Args:
+            template: Filter by template name
+            search: Case-insensitive substring matched against text columns
+            sort_by: One of the keys in SORT_ORDERS
+            limit: Page size
+            offset: Number of matching rows to skip
+            columns: Only return these lead fields (all if None)
+
+        Returns:
+            Tuple of (leads on this page, total matching leads)
+        """
+        with self._connection() as conn:
+            cursor = conn.cursor()
+
+            clauses = []
+            params: List = []
+
+            if template:
+                clauses.append("template = ?")
+                params.append(template)
+
+            if search:
+                pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                clauses.append(
+                    "(" + " OR ".join(f"{col} LIKE ? ESCAPE '\\'" for col in self.SEARCH_COLUMNS) + ")"
+                )
+                params.extend([pattern] * len(self.SEARCH_COLUMNS))
+
+            where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+            cursor.execute(f"SELECT COUNT(*) FROM leads{where}", params)
+            total = cursor.fetchone()[0]
+
+            order = self.SORT_ORDERS.get(sort_by, self.SORT_ORDERS["newest"])
+            cursor.execute(
+                f"SELECT *, {self.EPOCH_COLUMNS} FROM leads{where} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            )
+            leads = [self._row_to_lead(row, columns) for row in cursor.fetchall()]
+
+            return leads, total
+
+    def get_distinct_templates(self) -> List[str]:
+        """Sorted template names that have at least one lead."""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "SELECT DISTINCT template FROM leads WHERE template IS NOT NULL ORDER BY template"
+            )
+            templates = [row[0] for row in cursor.fetchall()]
+
+            return templates
+
+    @staticmethod
+    def _row_to_lead(row: sqlite3.Row, columns: Optional[Sequence[str]] = None) -> Dict:
+        """Convert a leads row into the dict shape returned to callers."""
+        lead = {
+            'id': row['id'],
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'company_name': row['company_name'],
+            'website_url': row['website_url'],
+            'email': row['email'],
+            'phone': row['phone'],
+            'template': row['template'],
+            'locations': row['locations'],
+            'created_at': row['created_at'],
+            'last_seen': row['last_seen'],
+            'times_seen': row['times_seen']
+        }
+        for column in ('created_ts', 'post_ts'):
+            if column in row.keys():
+                lead[column] = row[column]
+        if columns:
+            lead = {key: value for key, value in lead.items() if key in columns}
+        return lead
 
     def get_search_history(self, limit: int = 50) -> List[Dict]:
         """Get recent search history."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with self._connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT * FROM search_history
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
+            cursor.execute("""
+                SELECT * FROM search_history
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (limit,))
 
-        rows = cursor.fetchall()
-        history = [dict(row) for row in rows]
+            rows = cursor.fetchall()
+            history = [dict(row) for row in rows]
 
-        conn.close()
-        return history
+            return history
 
     def get_stats(self) -> Dict:
         """Get database statistics."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        stats = {}
-
-        # Total leads
-        cursor.execute("SELECT COUNT(*) FROM leads")
-        stats['total_leads'] = cursor.fetchone()[0]
-
-        # Leads with email
-        cursor.execute("SELECT COUNT(*) FROM leads WHERE email != ''")
-        stats['leads_with_email'] = cursor.fetchone()[0]
-
-        # Leads with phone
-        cursor.execute("SELECT COUNT(*) FROM leads WHERE phone != ''")
-        stats['leads_with_phone'] = cursor.fetchone()[0]
-
-        # New leads today
-        cursor.execute("""
-            SELECT COUNT(*) FROM leads
-            WHERE DATE(created_at) = DATE('now')
-        """)
-        stats['new_today'] = cursor.fetchone()[0]
-
-        # Total searches
-        cursor.execute("SELECT COUNT(*) FROM search_history")
-        stats['total_searches'] = cursor.fetchone()[0]
-
-        # Total API queries used
-        cursor.execute("SELECT COALESCE(SUM(api_queries_used), 0) FROM search_history")
-        stats['total_api_queries'] = cursor.fetchone()[0]
-
-        # API queries today
-        cursor.execute("""
-            SELECT COALESCE(SUM(api_queries_used), 0) FROM search_history
-            WHERE DATE(timestamp) = DATE('now')
-        """)
-        stats['api_queries_today'] = cursor.fetchone()[0]
-
-        # Most used template
-        cursor.execute("""
-            SELECT template, COUNT(*) as count
-            FROM search_history
-            GROUP BY template
-            ORDER BY count DESC
-            LIMIT 1
-        """)
-        result = cursor.fetchone()
-        stats['most_used_template'] = result[0] if result else "None"
-
-        conn.close()
-        return stats
+        with self._connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT
+                    COUNT(*),
+                    COALESCE(SUM(email != ''), 0),
+                    COALESCE(SUM(phone != ''), 0),
+                    COALESCE(SUM(DATE(created_at) = DATE('now')), 0)
+                FROM leads
+            """)
+            total_leads, leads_with_email, leads_with_phone, new_today = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT
+                    COUNT(*),
+                    COALESCE(SUM(api_queries_used), 0),
+                    COALESCE(SUM(CASE WHEN DATE(timestamp) = DATE('now') THEN api_queries_used END), 0),
+                    (
+                        SELECT template
+                        FROM search_history
+                        GROUP BY template
+                        ORDER BY COUNT(*) DESC
+                        LIMIT 1
+                    )
+                FROM search_history
+            """)
+            total_searches, total_api_queries, api_queries_today, most_used_template = cursor.fetchone()
+
+            stats = {
+                'total_leads': total_leads,
+                'leads_with_email': leads_with_email,
+                'leads_with_phone': leads_with_phone,
+                'new_today': new_today,
+                'total_searches': total_searches,
+                'total_api_queries': total_api_queries,
+                'api_queries_today': api_queries_today,
+                'most_used_template': most_used_template if total_searches else "None"
+            }
+
+            return stats
+
+    def update_match_flags(self, rows: List[Dict]) -> int:
+        """
+        Save computed location_match/keyword_match flags.
+
+        Args:
+            rows: Dicts with id, location_match and keyword_match
+
+        Returns:
+            Number of leads updated
+        """
+        if not rows:
+            return 0
+        with self._connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.executemany(
+                "UPDATE leads SET location_match = ?, keyword_match = ? WHERE id = ?",
+                [
+                    (1 if row['location_match'] else 0, 1 if row['keyword_match'] else 0, row['id'])
+                    for row in rows
+                ]
+            )
+
+            conn.commit()
+            return len(rows)
 
     def delete_lead(self, lead_id: int) -> bool:
         """Delete a lead by ID."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("DELETE FROM leads WHERE id = ?", (lead_id,))
-        deleted = cursor.rowcount > 0
+            cursor.execute("DELETE FROM leads WHERE id = ?", (lead_id,))
+            deleted = cursor.rowcount > 0
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
-        return deleted
+            return deleted
 
     def export_all_leads(self) -> List[Dict]:
         """Export all leads for backup."""
@@ -416,13 +613,12 @@ class LeadDatabase:
 
     def clear_database(self) -> bool:
         """Clear all data (use with caution!)."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("DELETE FROM leads")
-        cursor.execute("DELETE FROM search_history")
+            cursor.execute("DELETE FROM leads")
+            cursor.execute("DELETE FROM search_history")
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
-        return True
+            return True
@@ -3,8 +3,9 @@ Supabase database adapter for storing and managing leads.
 Cloud-based, persistent storage that works with Streamlit Cloud.
 """
 import os
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Sequence, Set, Tuple
 import hashlib
 from supabase import create_client, Client
 
@@ -12,6 +13,28 @@ from supabase import create_client, Client
 class SupabaseLeadDatabase:
     """Manage leads database with Supabase (cloud PostgreSQL)."""
 
+    # Text columns matched by query_leads(search=...)
+    SEARCH_COLUMNS = (
+        'first_name', 'last_name', 'company_name',
+        'email', 'phone', 'website_url', 'template'
+    )
+
+    # (column, descending) order terms for query_leads(sort_by=...).
+    # Descending text sorts put empty values last, i.e. "has value" first.
+    SORT_ORDERS = {
+        'newest': [('created_at', True)],
+        'oldest': [('created_at', False)],
+        'most_seen': [('times_seen', True), ('created_at', True)],
+        'has_email': [('email', True), ('created_at', True)],
+        'has_phone': [('phone', True), ('created_at', True)],
+        'location_match': [('location_match', True), ('created_at', True)],
+    }
+
+    # url_hash/id values per IN (...) lookup or update; keeps the request URL short
+    LOOKUP_CHUNK_SIZE = 200
+    # Rows per bulk insert/upsert request
+    WRITE_CHUNK_SIZE = 1000
+
     def __init__(self):
         """Initialize Supabase connection."""
         supabase_url = os.getenv("SUPABASE_URL")
@@ -46,6 +69,15 @@ class SupabaseLeadDatabase:
         new_leads = []
         duplicate_leads = []
         location_str = ", ".join(locations)
+        now = datetime.now().isoformat()
+
+        existing_by_hash = self._leads_by_hash({
+            self._hash_url(lead['website_url']) for lead in leads if lead.get('website_url')
+        })
+        # Rows to insert and column changes for existing rows, keyed by
+        # url_hash so repeats within the batch merge
+        insert_rows: Dict[str, Dict] = {}
+        update_rows: Dict[str, Dict] = {}
 
         for lead in leads:
             url = lead.get('website_url', '')
@@ -54,46 +86,22 @@ class SupabaseLeadDatabase:
 
             url_hash = self._hash_url(url)
 
-            # Check if lead already exists
-            existing = self.supabase.table('leads').select('*').eq('url_hash', url_hash).execute()
-
-            if existing.data:
-                # Update existing lead
-                existing_lead = existing.data[0]
-                times_seen = existing_lead.get('times_seen', 1) + 1
-
-                update_data = {
-                    'last_seen': datetime.now().isoformat(),
-                    'times_seen': times_seen
-                }
-
-                # Update fields if new data provided
-                if lead.get('email'):
-                    update_data['email'] = lead['email']
-                if lead.get('phone'):
-                    update_data['phone'] = lead['phone']
-                if lead.get('first_name'):
-                    update_data['first_name'] = lead['first_name']
-                if lead.get('last_name'):
-                    update_data['last_name'] = lead['last_name']
-                if lead.get('company_name'):
-                    update_data['company_name'] = lead['company_name']
-                if lead.get('location_match'):
-                    update_data['location_match'] = True
-                if lead.get('intent_match'):
-                    update_data['intent_match'] = True
-                if lead.get('lead_source'):
-                    update_data['lead_source'] = lead['lead_source']
-                if lead.get('post_created_at'):
-                    update_data['post_created_at'] = lead['post_created_at']
-                if lead.get('keyword_match'):
-                    update_data['keyword_match'] = True
-
-                self.supabase.table('leads').update(update_data).eq('id', existing_lead['id']).execute()
+            if url_hash in insert_rows:
+                # Repeat of a lead inserted earlier in this batch
+                self._merge_lead(insert_rows[url_hash], lead)
+                duplicate_leads.append(lead)
+            elif url_hash in existing_by_hash:
+                # Update existing lead: only the columns this sighting changes,
+                # so concurrent writes to other columns aren't overwritten
+                changes = update_rows.setdefault(url_hash, {
+                    'times_seen': existing_by_hash[url_hash].get('times_seen'),
+                    'last_seen': now
+                })
+                self._merge_lead(changes, lead)
                 duplicate_leads.append(lead)
             else:
                 # Insert new lead
-                insert_data = {
+                insert_rows[url_hash] = {
                     'first_name': lead.get('first_name', ''),
                     'last_name': lead.get('last_name', ''),
                     'company_name': lead.get('company_name', ''),
@@ -110,10 +118,21 @@ class SupabaseLeadDatabase:
                     'post_created_at': lead.get('post_created_at'),
                     'keyword_match': bool(lead.get('keyword_match'))
                 }
-
-                self.supabase.table('leads').insert(insert_data).execute()
                 new_leads.append(lead)
 
+        for chunk in self._chunks(list(insert_rows.values()), self.WRITE_CHUNK_SIZE):
+            self.supabase.table('leads').insert(chunk).execute()
+        # Leads with identical changes (e.g. a second sighting and nothing
+        # new) share one update per id chunk
+        ids_by_changes: Dict[Tuple, List] = {}
+        for url_hash, changes in update_rows.items():
+            ids_by_changes.setdefault(tuple(sorted(changes.items())), []).append(
+                existing_by_hash[url_hash]['id']
+            )
+        for changes, ids in ids_by_changes.items():
+            for chunk in self._chunks(ids, self.LOOKUP_CHUNK_SIZE):
+                self.supabase.table('leads').update(dict(changes)).in_('id', chunk).execute()
+
         # Add to search history
         history_data = {
             'template': template,
@@ -127,13 +146,57 @@ class SupabaseLeadDatabase:
 
         return new_leads, duplicate_leads
 
+    @staticmethod
+    def _select(columns: Optional[Sequence[str]]) -> str:
+        """PostgREST select list for columns (all columns if None)."""
+        return ",".join(columns) if columns else '*'
+
+    @staticmethod
+    def _chunks(items: List, size: int):
+        """Yield consecutive slices of items of at most size elements."""
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+
+    def _leads_by_hash(self, url_hashes) -> Dict[str, Dict]:
+        """Existing leads' id/url_hash/times_seen for the given url_hash values, keyed by url_hash."""
+        found = {}
+        for chunk in self._chunks(sorted(url_hashes), self.LOOKUP_CHUNK_SIZE):
+            result = self.supabase.table('leads').select('id,url_hash,times_seen').in_('url_hash', chunk).execute()
+            for row in result.data or []:
+                found[row['url_hash']] = row
+        return found
+
+    @staticmethod
+    def _merge_lead(row: Dict, lead: Dict) -> None:
+        """Count another sighting of a stored lead and take any new data from it."""
+        row['times_seen'] = (row.get('times_seen') or 1) + 1
+
+        # Update fields if new data provided
+        for field in ('email', 'phone', 'first_name', 'last_name', 'company_name',
+                      'lead_source', 'post_created_at'):
+            if lead.get(field):
+                row[field] = lead[field]
+        for flag in ('location_match', 'intent_match', 'keyword_match'):
+            if lead.get(flag):
+                row[flag] = True
+
+    def get_existing_urls(self, urls: Sequence[str]) -> Set[str]:
+        """The given URLs that already have a lead row (matched by url_hash)."""
+        found = set()
+        hashes = sorted({self._hash_url(url) for url in urls if url})
+        for chunk in self._chunks(hashes, self.LOOKUP_CHUNK_SIZE):
+            result = self.supabase.table('leads').select('url_hash').in_('url_hash', chunk).execute()
+            found.update(row['url_hash'] for row in result.data or [])
+        return {url for url in urls if url and self._hash_url(url) in found}
+
     def get_all_leads(
         self,
         limit: Optional[int] = None,
-        template: Optional[str] = None
+        template: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
     ) -> List[Dict]:
-        """Get all leads from database."""
-        query = self.supabase.table('leads').select('*').order('created_at', desc=True)
+        """Get all leads from database (only the given columns, if any)."""
+        query = self.supabase.table('leads').select(self._select(columns)).order('created_at', desc=True)
 
         if template:
             query = query.eq('template', template)
@@ -144,13 +207,84 @@ class SupabaseLeadDatabase:
         result = query.execute()
         return result.data if result.data else []
 
+    def query_leads(
+        self,
+        template: Optional[str] = None,
+        search: Optional[str] = None,
+        sort_by: str = "newest",
+        limit: int = 500,
+        offset: int = 0,
+        columns: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Dict], int]:
+        """
+        Get one page of leads with filtering and sorting done server-side.
+
+        If selecting only the given columns fails (e.g. a column from a
+        newer migration doesn't exist yet), all columns are selected instead.
+
+        Returns:
+            Tuple of (leads on this page, total matching leads)
+        """
+        query = self.supabase.table('leads').select(self._select(columns), count='exact')
+
+        if template:
+            query = query.eq('template', template)
+
+        if search:
+            # Quote the value so commas/parentheses don't break the or= filter
+            value = search.replace('\\', '\\\\').replace('"', '\\"')
+            query = query.or_(",".join(
+                f'{col}.ilike."*{value}*"' for col in self.SEARCH_COLUMNS
+            ))
+
+        for column, desc in self.SORT_ORDERS.get(sort_by, self.SORT_ORDERS['newest']):
+            query = query.order(column, desc=desc, nullsfirst=False)
+
+        try:
+            result = query.range(offset, offset + limit - 1).execute()
+        except Exception:
+            if not columns:
+                raise
+            return self.query_leads(template, search, sort_by, limit, offset)
+        leads = result.data if result.data else []
+        total = result.count if getattr(result, 'count', None) is not None else len(leads)
+        return leads, total
+
+    def get_distinct_templates(self) -> List[str]:
+        """
+        Sorted template names that have at least one lead.
+
+        Uses the distinct_templates() function from supabase_migration.sql;
+        falls back to reading only the template column if it isn't installed.
+        """
+        try:
+            result = self.supabase.rpc('distinct_templates').execute()
+            return [row['template'] for row in (result.data or [])]
+        except Exception:
+            result = self.supabase.table('leads').select('template').execute()
+            return sorted({row['template'] for row in (result.data or []) if row.get('template')})
+
     def get_search_history(self, limit: int = 50) -> List[Dict]:
         """Get recent search history."""
         result = self.supabase.table('search_history').select('*').order('timestamp', desc=True).limit(limit).execute()
         return result.data if result.data else []
 
     def get_stats(self) -> Dict:
-        """Get database statistics."""
+        """
+        Get database statistics.
+
+        One call to the get_lead_stats() function from supabase_migration.sql;
+        falls back to one query per stat if it isn't installed.
+        """
+        today = datetime.now().date().isoformat()
+        try:
+            result = self.supabase.rpc('get_lead_stats', {'since': today}).execute()
+        except Exception:
+            return self._get_stats_per_query()
+        return result.data
+
+    def _get_stats_per_query(self) -> Dict:
+        """Database statistics, one request per stat."""
         stats = {}
 
         # Total leads
@@ -186,14 +320,35 @@ class SupabaseLeadDatabase:
         # Most used template
         template_result = self.supabase.table('search_history').select('template').execute()
         if template_result.data:
-            templates = [row['template'] for row in template_result.data]
-            most_common = max(set(templates), key=templates.count) if templates else "None"
-            stats['most_used_template'] = most_common
+            templates = Counter(row['template'] for row in template_result.data)
+            stats['most_used_template'] = templates.most_common(1)[0][0]
         else:
             stats['most_used_template'] = "None"
 
         return stats
 
+    def update_match_flags(self, rows: List[Dict]) -> int:
+        """
+        Save computed location_match/keyword_match flags.
+
+        Leads sharing the same pair of values go in one update, so this is at
+        most four requests however many rows there are.
+
+        Returns:
+            Number of leads updated
+        """
+        ids_by_flags: Dict[Tuple[bool, bool], List] = {}
+        for row in rows:
+            flags = (bool(row['location_match']), bool(row['keyword_match']))
+            ids_by_flags.setdefault(flags, []).append(row['id'])
+
+        for (location_match, keyword_match), ids in ids_by_flags.items():
+            self.supabase.table('leads').update({
+                'location_match': location_match,
+                'keyword_match': keyword_match
+            }).in_('id', ids).execute()
+        return len(rows)
+
     def delete_lead(self, lead_id: int) -> bool:
         """Delete a lead by ID."""
         result = self.supabase.table('leads').delete().eq('id', lead_id).execute()
@@ -0,0 +1,127 @@
+"""
+Near-duplicate detection for leads using MinHash LSH.
+The same company often shows up under several URLs (Instagram, Facebook,
+its own site) with slightly different names, which exact url_hash
+matching cannot catch. Only leads with a company name are compared: names
+pulled from result titles (people, Reddit posts) are too generic to key on.
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+@lru_cache(maxsize=1)
+def _datasketch():
+    """
+    (MinHash, MinHashLSH), imported on first use since datasketch is slow to
+    import. Optional dependency; both are None (index is a no-op) without it.
+    """
+    try:
+        from datasketch import MinHash, MinHashLSH
+    except ImportError:
+        return None, None
+    return MinHash, MinHashLSH
+
+
+class NearDupIndex:
+    """MinHash LSH index over lead name/company text."""
+
+    SHINGLE_SIZE = 3
+    # Shorter name text is too generic to call two leads the same
+    MIN_TEXT_LENGTH = 8
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128):
+        """Create an empty index (disabled if datasketch isn't installed)."""
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self._minhash_cls, self._lsh_cls = _datasketch()
+        self.enabled = self._lsh_cls is not None
+        self._lsh = self._new_lsh() if self.enabled else None
+        self._next_key = 0
+
+    def _new_lsh(self):
+        """Empty LSH with this index's threshold and permutation count."""
+        return self._lsh_cls(threshold=self.threshold, num_perm=self.num_perm)
+
+    @staticmethod
+    def _lead_text(lead: Dict) -> str:
+        """
+        Normalized company name used for comparison ("" if the lead has none
+        or is a Reddit post, which are never compared).
+        """
+        if lead.get("lead_source") == "reddit" or "reddit.com" in (lead.get("website_url") or ""):
+            return ""
+        return re.sub(r"\s+", " ", str(lead.get("company_name") or "")).strip().lower()
+
+    def _minhash(self, text: str):
+        """MinHash signature over character shingles of text."""
+        m = self._minhash_cls(num_perm=self.num_perm)
+        size = self.SHINGLE_SIZE
+        m.update_batch([
+            text[i:i + size].encode("utf-8")
+            for i in range(max(1, len(text) - size + 1))
+        ])
+        return m
+
+    def _signature(self, lead: Dict):
+        """Signature for a lead, or None if it has too little text to compare."""
+        if not self.enabled:
+            return None
+        text = self._lead_text(lead)
+        if len(text) < self.MIN_TEXT_LENGTH:
+            return None
+        return self._minhash(text)
+
+    def _insert(self, signature) -> None:
+        self._lsh.insert(str(self._next_key), signature)
+        self._next_key += 1
+
+    def add_all(self, leads: Iterable[Dict]) -> None:
+        """Add leads to the index."""
+        for lead in leads:
+            signature = self._signature(lead)
+            if signature is not None:
+                self._insert(signature)
+
+    def is_duplicate(self, lead: Dict) -> bool:
+        """Return True if a near-identical lead is already indexed."""
+        signature = self._signature(lead)
+        return signature is not None and bool(self._lsh.query(signature))
+
+    def partition(
+        self,
+        leads: List[Dict],
+        exempt: Optional[Callable[[Dict], bool]] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split leads into (unique, near_duplicates) without changing the index.
+
+        Near-duplicates within the batch are caught too. Leads for which
+        exempt(lead) is true (e.g. already stored under their URL) always
+        count as unique. Add the leads that get saved with add_all.
+
+        Returns:
+            Tuple of (unique_leads, near_duplicate_leads)
+        """
+        unique = []
+        near_duplicates = []
+        batch = self._new_lsh() if self.enabled else None
+        for i, lead in enumerate(leads):
+            if exempt is not None and exempt(lead):
+                unique.append(lead)
+                continue
+            signature = self._signature(lead)
+            if signature is not None and (self._lsh.query(signature) or batch.query(signature)):
+                near_duplicates.append(lead)
+                continue
+            if signature is not None:
+                batch.insert(str(i), signature)
+            unique.append(lead)
+        return unique, near_duplicates
+
+    @classmethod
+    def from_leads(cls, leads: Iterable[Dict], **kwargs) -> "NearDupIndex":
+        """Build an index pre-loaded with existing leads."""
+        index = cls(**kwargs)
+        index.add_all(leads)
+        return index
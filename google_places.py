@@ -3,10 +3,15 @@ Google Places API client for geo-targeted business searches.
 """
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limiter import TokenBucket
 
 load_dotenv()
 
@@ -15,6 +20,11 @@ GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
 PLACES_SEARCH_URL = "https://places.googleapis.com/v1/places:searchText"
 PLACE_DETAILS_URL = "https://places.googleapis.com/v1/places/"
 
+# Default per-minute quotas as requests per second: Geocoding 3000/min,
+# Places (New) 600/min for each method
+GEOCODE_QPS = 50
+PLACES_QPS = 10
+
 
 class GooglePlacesClient:
     """Client for Google Places API (Text Search + Details)."""
@@ -25,19 +35,54 @@ class GooglePlacesClient:
             raise ValueError(
                 "GOOGLE_PLACES_API_KEY is required for Places API searches."
             )
+        # place_id -> details; place IDs are stable, so repeat lookups are free
+        self._details_cache: Dict[str, Dict] = {}
+        # normalized location -> coords (None if not found); addresses don't move
+        self._geocode_cache: Dict[str, Optional[Tuple[float, float]]] = {}
+        # Stay under quota instead of tripping 429s when workers burst
+        self._geocode_bucket = TokenBucket(GEOCODE_QPS, GEOCODE_QPS)
+        self._search_bucket = TokenBucket(PLACES_QPS, PLACES_QPS)
+        self._details_bucket = TokenBucket(PLACES_QPS, PLACES_QPS)
+        # Keep-alive session, so calls reuse TLS connections to googleapis.com;
+        # the pool covers place_details_many/geocode_many workers
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                # Text Search is a read-only POST, so it is safe to retry too
+                allowed_methods=frozenset({"GET", "POST"}),
+                raise_on_status=False
+            )
+        ))
+
+    def close(self) -> None:
+        """Close the client's HTTP connections."""
+        self._session.close()
 
     def geocode(self, location: str) -> Optional[Tuple[float, float]]:
         if not location:
             return None
+        key = " ".join(location.lower().split())
+        if key in self._geocode_cache:
+            return self._geocode_cache[key]
         params = {"address": location, "key": self.api_key}
-        resp = requests.get(GEOCODE_URL, params=params, timeout=20)
+        self._geocode_bucket.acquire()
+        resp = self._session.get(GEOCODE_URL, params=params, timeout=20)
         resp.raise_for_status()
         data = resp.json()
         results = data.get("results", [])
-        if not results:
-            return None
-        loc = results[0]["geometry"]["location"]
-        return loc["lat"], loc["lng"]
+        coords = None
+        if results:
+            loc = results[0]["geometry"]["location"]
+            coords = loc["lat"], loc["lng"]
+        # Quota/denied responses also come back empty; only cache real answers
+        if data.get("status") in ("OK", "ZERO_RESULTS"):
+            self._geocode_cache[key] = coords
+        return coords
 
     def text_search(
         self,
@@ -50,7 +95,11 @@ class GooglePlacesClient:
         headers = {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": self.api_key,
-            "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,nextPageToken"
+            # Website and phone come back with each place, so no details call is needed
+            "X-Goog-FieldMask": (
+                "places.id,places.displayName,places.formattedAddress,"
+                "places.websiteUri,places.internationalPhoneNumber,nextPageToken"
+            )
         }
         payload: Dict = {
             "textQuery": query,
@@ -65,11 +114,14 @@ class GooglePlacesClient:
             }
         if pagetoken:
             payload["pageToken"] = pagetoken
-        resp = requests.post(PLACES_SEARCH_URL, headers=headers, json=payload, timeout=20)
+        self._search_bucket.acquire()
+        resp = self._session.post(PLACES_SEARCH_URL, headers=headers, json=payload, timeout=20)
         resp.raise_for_status()
         return resp.json()
 
     def place_details(self, place_id: str) -> Dict:
+        if place_id in self._details_cache:
+            return self._details_cache[place_id]
         headers = {
             "X-Goog-Api-Key": self.api_key,
             "X-Goog-FieldMask": "id,displayName,formattedAddress,websiteUri,internationalPhoneNumber"
@@ -77,9 +129,33 @@ class GooglePlacesClient:
         params = {
             "fields": "displayName,formattedAddress,websiteUri,internationalPhoneNumber"
         }
-        resp = requests.get(f"{PLACE_DETAILS_URL}{place_id}", headers=headers, params=params, timeout=20)
+        self._details_bucket.acquire()
+        resp = self._session.get(f"{PLACE_DETAILS_URL}{place_id}", headers=headers, params=params, timeout=20)
         resp.raise_for_status()
-        return resp.json()
+        details = resp.json()
+        self._details_cache[place_id] = details
+        return details
+
+    def place_details_many(self, place_ids: List[str], max_workers: int = 10) -> Dict[str, Dict]:
+        """Fetch details for several places concurrently; failed lookups map to {}."""
+        def fetch(place_id: str) -> Dict:
+            try:
+                return self.place_details(place_id)
+            except Exception:
+                return {}
+
+        unique_ids = list(dict.fromkeys(pid for pid in place_ids if pid))
+        if not unique_ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(unique_ids, executor.map(fetch, unique_ids)))
+
+    def geocode_many(self, locations: List[str], max_workers: int = 10) -> List[Optional[Tuple[float, float]]]:
+        """Geocode several locations concurrently, in order; errors surface as in geocode."""
+        if not locations:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(locations))) as executor:
+            return list(executor.map(self.geocode, locations))
 
     def search_locations(
         self,
@@ -99,8 +175,15 @@ class GooglePlacesClient:
             "last_status": None
         }
 
+        # "Boston, MA" and "boston ma" are the same place: search it once
+        unique_locations: Dict[str, str] = {}
         for loc in locations:
-            coords = self.geocode(loc)
+            unique_locations.setdefault(" ".join(loc.replace(",", " ").lower().split()), loc)
+        locations = list(unique_locations.values())
+
+        # Geocodes don't depend on each other, so resolve them all up front;
+        # the searches stay sequential since each stops once max_results is hit
+        for loc, coords in zip(locations, self.geocode_many(locations)):
             if not coords:
                 continue
             stats["locations_geocoded"] += 1
@@ -108,13 +191,24 @@ class GooglePlacesClient:
             query = f"{base_query} in {loc}".strip()
             next_token = None
             while len(results) < max_results:
-                data = self.text_search(
+                search_args = dict(
                     query=query,
                     location=coords,
                     radius_meters=radius_meters,
                     pagetoken=next_token,
                     max_results=min(20, max_results - len(results))
                 )
+                try:
+                    data = self.text_search(**search_args)
+                except requests.HTTPError as exc:
+                    # A fresh page token can be rejected until it becomes valid;
+                    # only then wait delay_seconds and retry once. 429/5xx never
+                    # get here: the session retries those (POST included) with
+                    # backoff, honoring Retry-After
+                    if not next_token or exc.response is None or exc.response.status_code != 400:
+                        raise
+                    time.sleep(delay_seconds)
+                    data = self.text_search(**search_args)
                 stats["last_status"] = data.get("status") or data.get("error", {}).get("message")
                 for item in data.get("places", []):
                     place_id = item.get("id")
@@ -128,7 +222,6 @@ class GooglePlacesClient:
                 next_token = data.get("nextPageToken")
                 if not next_token or len(results) >= max_results:
                     break
-                time.sleep(delay_seconds)
 
             if len(results) >= max_results:
                 break
@@ -2,17 +2,29 @@
 Google Custom Search API client for finding real estate contacts and leads.
 """
 import os
-import time
 import re
-from typing import List, Dict, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Sequence, Set, Tuple
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rate_limiter import TokenBucket
 from search_templates import SearchTemplates
 
 # Load environment variables
 load_dotenv()
 
 
+class PartialSearchError(Exception):
+    """A results page failed to load; results holds the pages fetched before it."""
+
+    def __init__(self, results: List[Dict], error: Exception):
+        super().__init__(str(error))
+        self.results = results
+
+
 class GoogleSearchClient:
     """Client for Google Custom Search API."""
 
@@ -22,6 +34,10 @@ class GoogleSearchClient:
         "hl": "en",
         "cr": "countryUS"
     }
+    # Custom Search's default quota is 100 queries/minute; allow one
+    # 10-page search_multiple_pages burst at a time
+    QUERIES_PER_SECOND = 100 / 60
+    BURST_QUERIES = 10
 
     def __init__(self, api_key: Optional[str] = None, cse_id: Optional[str] = None):
         """
@@ -41,13 +57,32 @@ class GoogleSearchClient:
                 "or pass them as arguments."
             )
 
+        # Keep-alive session, so pages reuse TLS connections to googleapis.com;
+        # the pool covers search_multiple_pages workers
+        self._bucket = TokenBucket(self.QUERIES_PER_SECOND, self.BURST_QUERIES)
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                raise_on_status=False
+            )
+        ))
+
+    def close(self) -> None:
+        """Close the client's HTTP connections."""
+        self._session.close()
+
+    @staticmethod
     def build_query(
-        self,
         keywords: List[str],
         locations: List[str],
         sites: Optional[List[str]] = None,
-        email_domains: Optional[List[str]] = None,
-        exclude_terms: Optional[List[str]] = None,
+        email_domains: Optional[Sequence[str]] = None,
+        exclude_terms: Optional[Sequence[str]] = None,
         intent_phrases: Optional[List[str]] = None,
         reddit_subreddits: Optional[List[str]] = None
     ) -> str:
@@ -106,7 +141,8 @@ class GoogleSearchClient:
         query: str,
         num_results: int = 10,
         start_index: int = 1,
-        date_restrict: Optional[str] = None
+        date_restrict: Optional[str] = None,
+        raise_errors: bool = False
     ) -> List[Dict]:
         """
         Execute a search query using Google Custom Search API.
@@ -115,6 +151,7 @@ class GoogleSearchClient:
             query: The search query string
             num_results: Number of results to return (max 10 per request)
             start_index: Starting index for pagination (1-based)
+            raise_errors: Raise request/JSON errors instead of returning []
 
         Returns:
             List of search result dictionaries
@@ -130,8 +167,9 @@ class GoogleSearchClient:
             params["dateRestrict"] = date_restrict
         params.update(self.DEFAULT_PARAMS)
 
+        self._bucket.acquire()
         try:
-            response = requests.get(self.BASE_URL, params=params, timeout=30)
+            response = self._session.get(self.BASE_URL, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -147,12 +185,82 @@ class GoogleSearchClient:
             return results
 
         except requests.exceptions.RequestException as e:
+            if raise_errors:
+                raise
             print(f"Error making search request: {e}")
             return []
         except ValueError as e:
+            if raise_errors:
+                raise
             print(f"Error parsing response JSON: {e}")
             return []
 
+    def search_multiple_pages(
+        self,
+        query: str,
+        total_results: int = 100,
+        delay: float = 1.0,
+        date_restrict: Optional[str] = None,
+        max_workers: int = 5,
+        raise_errors: bool = False
+    ) -> List[Dict]:
+        """
+        Search multiple pages of results (handles pagination).
+
+        Pages are addressed by start index, so they are independent and are
+        fetched concurrently instead of one after another.
+
+        Args:
+            query: The search query string
+            total_results: Total number of results to retrieve
+            delay: Unused; kept for backwards compatibility with callers
+            max_workers: Maximum number of pages fetched at the same time
+            raise_errors: Raise PartialSearchError (holding the results of the
+                pages before it) when a page fails, instead of stopping there
+
+        Returns:
+            List of all search result dictionaries
+        """
+        results_per_page = 10  # API maximum
+        pages_needed = (total_results + results_per_page - 1) // results_per_page
+        if pages_needed <= 0:
+            return []
+
+        print(f"Fetching up to {total_results} results ({pages_needed} pages)...")
+
+        start_indexes = [page * results_per_page + 1 for page in range(pages_needed)]
+        all_results = []
+        with ThreadPoolExecutor(max_workers=min(max_workers, pages_needed)) as executor:
+            futures = [
+                executor.submit(
+                    self.search,
+                    query,
+                    num_results=results_per_page,
+                    start_index=start_index,
+                    date_restrict=date_restrict,
+                    raise_errors=raise_errors
+                )
+                for start_index in start_indexes
+            ]
+            for page, future in enumerate(futures):
+                try:
+                    results = future.result()
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    for pending in futures[page + 1:]:
+                        pending.cancel()
+                    print(f"Page {page + 1} failed after {len(all_results)} results: {e}")
+                    raise PartialSearchError(all_results, e) from e
+                if not results:
+                    print(f"No more results found at page {page + 1}")
+                    # Later pages are empty too; don't spend queries on those not started
+                    for pending in futures[page + 1:]:
+                        pending.cancel()
+                    break
+                all_results.extend(results)
+
+        print(f"Retrieved {len(all_results)} total results")
+        return all_results
+
 
 US_STATES = {
     "AL": "Alabama",
@@ -298,15 +406,14 @@ def reddit_intent_phrases() -> List[str]:
     ]
 
 
-def reddit_exclude_terms() -> List[str]:
-    return [
-        "megathread",
-        "weekly",
-        "monthly",
-        "rant",
-        "news",
-        "politics"
-    ]
+REDDIT_EXCLUDE_TERMS = (
+    "megathread",
+    "weekly",
+    "monthly",
+    "rant",
+    "news",
+    "politics"
+)
 
 def _parse_locations(locations: List[str]) -> Tuple[Set[str], Set[str], Set[str]]:
     allowed_cities: Set[str] = set()
@@ -355,6 +462,29 @@ def _abbrev_mentions(text: str, abbrevs: Set[str]) -> bool:
     return re.search(pattern, text) is not None
 
 
+@lru_cache(maxsize=256)
+def location_patterns(locations: Tuple[str, ...]) -> Tuple[Optional[re.Pattern], Optional[re.Pattern]]:
+    """
+    Compiled form of result_matches_locations' checks for reuse over many texts.
+
+    Returns (name_pattern, abbrev_pattern). name_pattern matches allowed city
+    or state names and is meant for lowercased text; abbrev_pattern matches
+    state abbreviations in the original text. Either is None when there is
+    nothing to match.
+    """
+    allowed_cities, allowed_state_abbrevs, allowed_state_names = _parse_locations(list(locations))
+    names = sorted(name for name in allowed_cities | allowed_state_names if name)
+    name_pattern = None
+    if names:
+        name_pattern = re.compile(r"\b(?:" + "|".join(re.escape(name) for name in names) + r")\b")
+    abbrev_pattern = None
+    if allowed_state_abbrevs:
+        abbrev_pattern = re.compile(
+            r"(?<![A-Za-z])(?:" + "|".join(sorted(allowed_state_abbrevs)) + r")(?![A-Za-z])"
+        )
+    return name_pattern, abbrev_pattern
+
+
 def rank_results_by_locations(
     results: List[Dict],
     locations: List[str]
@@ -418,53 +548,48 @@ def result_matches_locations(result: Dict, locations: List[str]) -> bool:
         or _abbrev_mentions(combined, allowed_state_abbrevs)
     )
 
-    def search_multiple_pages(
-        self,
-        query: str,
-        total_results: int = 100,
-        delay: float = 1.0,
-        date_restrict: Optional[str] = None
-    ) -> List[Dict]:
-        """
-        Search multiple pages of results (handles pagination).
-
-        Args:
-            query: The search query string
-            total_results: Total number of results to retrieve
-            delay: Delay in seconds between requests to avoid rate limiting
 
-        Returns:
-            List of all search result dictionaries
-        """
-        all_results = []
-        results_per_page = 10  # API maximum
-        pages_needed = (total_results + results_per_page - 1) // results_per_page
-
-        print(f"Fetching up to {total_results} results ({pages_needed} pages)...")
-
-        for page in range(pages_needed):
-            start_index = page * results_per_page + 1
-            print(f"Fetching page {page + 1}/{pages_needed} (results {start_index}-{start_index + results_per_page - 1})...")
+@lru_cache(maxsize=256)
+def build_template_query(
+    template_name: str,
+    locations: Tuple[str, ...],
+    sites: Tuple[str, ...],
+    include_emails: bool = True
+) -> str:
+    """
+    Build the dashboard's search query for a template.
 
-            results = self.search(
-                query,
-                num_results=results_per_page,
-                start_index=start_index,
-                date_restrict=date_restrict
-            )
+    Adds the template's intent phrases and, when Reddit is among the sites,
+    location subreddits and Reddit exclusions. Inputs are tuples so results
+    can be cached; the same template/location/site combination is rebuilt
+    on every search.
 
-            if not results:
-                print(f"No more results found at page {page + 1}")
-                break
+    Args:
+        template_name: Name of the template to use
+        locations: Locations to search
+        sites: Sites to restrict the search to
+        include_emails: Whether to include email domain search terms
 
-            all_results.extend(results)
+    Returns:
+        Formatted search query
+    """
+    template = SearchTemplates.get_template(template_name)
 
-            # Add delay between requests to be respectful to the API
-            if page < pages_needed - 1 and results:
-                time.sleep(delay)
+    exclude_terms = template["exclude_terms"]
+    reddit_subs = None
+    if "reddit.com" in sites:
+        exclude_terms = exclude_terms + REDDIT_EXCLUDE_TERMS
+        reddit_subs = build_reddit_subreddits(list(locations))
 
-        print(f"Retrieved {len(all_results)} total results")
-        return all_results
+    return GoogleSearchClient.build_query(
+        keywords=template["keywords"],
+        locations=list(locations),
+        sites=list(sites),
+        email_domains=SearchTemplates.EMAIL_DOMAINS if include_emails else None,
+        exclude_terms=exclude_terms,
+        intent_phrases=template.get("intent_phrases", []),
+        reddit_subreddits=reddit_subs
+    )
 
 
 def create_search_from_template(
@@ -485,13 +610,11 @@ def create_search_from_template(
     """
     template = SearchTemplates.get_template(template_name)
 
-    client = GoogleSearchClient()
-
     email_domains = None
     if include_emails:
         email_domains = SearchTemplates.EMAIL_DOMAINS
 
-    return client.build_query(
+    return GoogleSearchClient.build_query(
         keywords=template["keywords"],
         locations=locations,
         sites=template["sites"],
@@ -530,8 +653,7 @@ def create_realtor_search_query(
     keywords = ["realtor", "real estate agent", "real estate"]
     exclude_terms = ["job", "hiring"]
 
-    client = GoogleSearchClient()
-    return client.build_query(
+    return GoogleSearchClient.build_query(
         keywords=keywords,
         locations=locations,
         sites=sites,
@@ -0,0 +1,29 @@
+"""
+Batched column updates on the Supabase leads table, for the maintenance scripts.
+"""
+from typing import Dict, List
+
+# Lead ids per UPDATE ... WHERE id IN (...) request; keeps the request URL short
+ID_BATCH_SIZE = 200
+
+
+def flush_lead_updates(supabase, rows: List[Dict], column: str) -> int:
+    """
+    Write pending {"id", column} rows and clear rows.
+
+    Leads sharing a value are set with one update().in_("id", ...) per id
+    batch. A partial-row upsert would go through the insert path and fail
+    on the table's NOT NULL columns.
+
+    Returns:
+        Number of leads written
+    """
+    ids_by_value: Dict = {}
+    for row in rows:
+        ids_by_value.setdefault(row[column], []).append(row["id"])
+    for value, ids in ids_by_value.items():
+        for start in range(0, len(ids), ID_BATCH_SIZE):
+            supabase.table("leads").update({column: value}).in_("id", ids[start:start + ID_BATCH_SIZE]).execute()
+    count = len(rows)
+    rows.clear()
+    return count
@@ -0,0 +1,28 @@
+"""
+Client-side rate limiting for the Google API clients.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket: bursts up to capacity, refilled at rate tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Take tokens, sleeping until the bucket has refilled enough to cover them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Going negative reserves the tokens, so later callers queue behind this one
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
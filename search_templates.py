@@ -8,11 +8,11 @@ class SearchTemplates:
     """Collection of search query templates for different lead types."""
 
     # Common email domains to search for
-    EMAIL_DOMAINS = [
+    EMAIL_DOMAINS = (
         "@gmail.com", "@outlook.com", "@hotmail.com", "@live.com",
         "@yahoo.com", "@icloud.com", "@me.com", "@aol.com",
         "@comcast.net", "@verizon.net", "@att.net"
-    ]
+    )
 
     # Common social media sites
     SOCIAL_SITES = [
@@ -59,7 +59,7 @@ class SearchTemplates:
                     "looking for a real estate agent"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["job", "hiring", "career"],
+                "exclude_terms": ("job", "hiring", "career"),
                 "description": "Find real estate agents and realtors"
             },
 
@@ -83,7 +83,7 @@ class SearchTemplates:
                     "need a handyman"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["job", "hiring", "career"],
+                "exclude_terms": ("job", "hiring", "career"),
                 "description": "Find contractors and home improvement professionals"
             },
 
@@ -108,7 +108,7 @@ class SearchTemplates:
                     "pre-approved for mortgage"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["realtor", "agent", "for sale", "listing"],
+                "exclude_terms": ("realtor", "agent", "for sale", "listing"),
                 "description": "Find people who recently bought homes"
             },
 
@@ -130,7 +130,7 @@ class SearchTemplates:
                     "need a mortgage"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["realtor", "agent", "tips", "advice"],
+                "exclude_terms": ("realtor", "agent", "tips", "advice"),
                 "description": "Find first-time home buyers"
             },
 
@@ -154,7 +154,7 @@ class SearchTemplates:
                     "need a realtor"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["realtor", "agent", "I can help"],
+                "exclude_terms": ("realtor", "agent", "I can help"),
                 "description": "Find people looking to sell their homes"
             },
 
@@ -176,7 +176,7 @@ class SearchTemplates:
                     "empty nest downsizing"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["realtor", "agent"],
+                "exclude_terms": ("realtor", "agent"),
                 "description": "Find people downsizing/selling homes"
             },
 
@@ -201,7 +201,7 @@ class SearchTemplates:
                     "remodeling contractor"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["contractor", "business", "hire me"],
+                "exclude_terms": ("contractor", "business", "hire me"),
                 "description": "Find people needing home renovations"
             },
 
@@ -240,7 +240,7 @@ class SearchTemplates:
                     "water heater repair"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["contractor", "business", "hire me"],
+                "exclude_terms": ("contractor", "business", "hire me"),
                 "description": "Find people needing home repairs"
             },
 
@@ -264,7 +264,7 @@ class SearchTemplates:
                     "relocation assistance"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["realtor", "agent", "moving company"],
+                "exclude_terms": ("realtor", "agent", "moving company"),
                 "description": "Find people relocating to new areas"
             },
 
@@ -288,7 +288,7 @@ class SearchTemplates:
                     "real estate investor"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["course", "coaching", "mentor"],
+                "exclude_terms": ("course", "coaching", "mentor"),
                 "description": "Find real estate investors"
             },
 
@@ -312,7 +312,7 @@ class SearchTemplates:
                     "sell fast"
                 ],
                 "sites": SearchTemplates.SOCIAL_SITES,
-                "exclude_terms": ["buy houses", "we buy", "cash offer"],
+                "exclude_terms": ("buy houses", "we buy", "cash offer"),
                 "description": "Find people who need to sell quickly"
             },
         }
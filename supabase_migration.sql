@@ -24,3 +24,82 @@ ADD COLUMN IF NOT EXISTS post_created_at TIMESTAMP;
 
 ALTER TABLE leads
 ADD COLUMN IF NOT EXISTS keyword_match BOOLEAN DEFAULT FALSE;
+
+-- Distinct lead templates for the database page filter (called via RPC)
+CREATE OR REPLACE FUNCTION distinct_templates()
+RETURNS TABLE (template TEXT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT DISTINCT leads.template
+    FROM leads
+    WHERE leads.template IS NOT NULL
+    ORDER BY leads.template;
+$$;
+
+-- Epoch-second copies of the lead timestamps so the app can skip date parsing
+ALTER TABLE leads
+ADD COLUMN IF NOT EXISTS created_ts BIGINT;
+
+ALTER TABLE leads
+ADD COLUMN IF NOT EXISTS post_ts BIGINT;
+
+CREATE OR REPLACE FUNCTION set_lead_epochs()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.created_ts := extract(epoch FROM NEW.created_at)::BIGINT;
+    NEW.post_ts := extract(epoch FROM NEW.post_created_at)::BIGINT;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS leads_set_epochs ON leads;
+CREATE TRIGGER leads_set_epochs
+BEFORE INSERT OR UPDATE OF created_at, post_created_at ON leads
+FOR EACH ROW EXECUTE FUNCTION set_lead_epochs();
+
+UPDATE leads
+SET created_ts = extract(epoch FROM created_at)::BIGINT,
+    post_ts = extract(epoch FROM post_created_at)::BIGINT
+WHERE created_ts IS NULL;
+
+-- Dashboard stats in one call (SupabaseLeadDatabase.get_stats, via RPC);
+-- "today" counts rows at or after since
+CREATE OR REPLACE FUNCTION get_lead_stats(since DATE)
+RETURNS JSON
+LANGUAGE sql STABLE
+AS $$
+    WITH lead_counts AS (
+        SELECT
+            count(*) AS total_leads,
+            count(*) FILTER (WHERE email <> '') AS leads_with_email,
+            count(*) FILTER (WHERE phone <> '') AS leads_with_phone,
+            count(*) FILTER (WHERE created_at >= since) AS new_today
+        FROM leads
+    ),
+    search_counts AS (
+        SELECT
+            count(*) AS total_searches,
+            coalesce(sum(api_queries_used), 0) AS total_api_queries,
+            coalesce(sum(api_queries_used) FILTER (WHERE timestamp >= since), 0) AS api_queries_today
+        FROM search_history
+    )
+    SELECT json_build_object(
+        'total_leads', lead_counts.total_leads,
+        'leads_with_email', lead_counts.leads_with_email,
+        'leads_with_phone', lead_counts.leads_with_phone,
+        'new_today', lead_counts.new_today,
+        'total_searches', search_counts.total_searches,
+        'total_api_queries', search_counts.total_api_queries,
+        'api_queries_today', search_counts.api_queries_today,
+        'most_used_template', coalesce((
+            SELECT template
+            FROM search_history
+            GROUP BY template
+            ORDER BY count(*) DESC
+            LIMIT 1
+        ), 'None')
+    )
+    FROM lead_counts, search_counts;
+$$;